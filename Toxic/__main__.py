@@ -5,24 +5,23 @@ from pyrogram import idle
 from pytgcalls.exceptions import NoActiveGroupCall
 
 import config
-from Toxic import LOGGER, app, userbot
+from Toxic import LOGGER, YouTube, app, userbot
 from Toxic.core.call import Dev
+from Toxic.core.http import http
+from Toxic.core.userbot import assistants
 from Toxic.misc import sudo
 from Toxic.plugins import ALL_MODULES
+from Toxic.utils.stream.progressive import progressive
 from Toxic.utils.database import get_banned_users, get_gbanned
+from Toxic.utils.placement import placement
 from config import BANNED_USERS
 
 
 async def init():
-    if (
-        not config.STRING1
-        and not config.STRING2
-        and not config.STRING3
-        and not config.STRING4
-        and not config.STRING5
-    ):
+    if not config.STRING_SESSIONS:
         LOGGER(__name__).error("Assistant client variables not defined, exiting...")
         exit()
+    YouTube.start_workers()
     await sudo()
     try:
         users = await get_gbanned()
@@ -37,8 +36,10 @@ async def init():
     for all_module in ALL_MODULES:
         importlib.import_module("Toxic.plugins" + all_module)
     LOGGER("Toxic.plugins").info("Successfully Imported Modules...")
-    await userbot.start()
+    # PyTgCalls connects the shared assistant clients, Userbot then finishes their setup.
     await Dev.start()
+    await userbot.start()
+    await placement.rebalance(assistants)
     try:
         await Dev.stream_call("https://te.legra.ph/file/29f784eb49d230ab62e9e.mp4")
     except NoActiveGroupCall:
@@ -55,6 +56,9 @@ async def init():
     await idle()
     await app.stop()
     await userbot.stop()
+    YouTube.close()
+    await http.close()
+    await progressive.close()
     LOGGER("Toxic").info("Stopping Toxic Bot...")
 
 
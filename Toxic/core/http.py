@@ -0,0 +1,70 @@
+import importlib.util
+from typing import Dict, Optional
+
+import aiohttp
+import httpx
+
+from config import HTTP_DNS_TTL, HTTP_POOL_SIZE, HTTP_TIMEOUT
+
+from ..logging import LOGGER
+
+# HTTP/2 needs the optional "h2" package (pip install httpx[http2]).
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+class HTTPClients:
+    """Long-lived HTTP clients shared by the whole bot.
+
+    httpx clients are kept per proxy so each proxy gets its own keep-alive
+    pool (and HTTP/2 when available). The aiohttp session used by the
+    scrapers caches DNS answers for ``HTTP_DNS_TTL`` seconds.
+    """
+
+    def __init__(self, pool_size: int, timeout: float, dns_ttl: int):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.dns_ttl = dns_ttl
+        self._clients: Dict[Optional[str], httpx.AsyncClient] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def client(self, proxy: Optional[str] = None) -> httpx.AsyncClient:
+        client = self._clients.get(proxy)
+        if client is None or client.is_closed:
+            client = self._clients[proxy] = httpx.AsyncClient(
+                http2=HTTP2,
+                proxies={"all://": proxy} if proxy else None,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                    keepalive_expiry=60,
+                ),
+            )
+        return client
+
+    def session(self) -> aiohttp.ClientSession:
+        # Created lazily: aiohttp binds the session to the running loop.
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.pool_size,
+                    ttl_dns_cache=self.dns_ttl,
+                    keepalive_timeout=60,
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                LOGGER(__name__).error("Error closing HTTP client: %s", repr(e))
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+http = HTTPClients(HTTP_POOL_SIZE, HTTP_TIMEOUT, HTTP_DNS_TTL)
@@ -0,0 +1,438 @@
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pyrogram.types import InlineKeyboardMarkup
+
+import config
+from Toxic import YouTube, app
+from Toxic.logging import LOGGER
+from Toxic.misc import db
+from Toxic.utils.database import get_lang, get_loop, group_assistant, is_music_playing, music_off, music_on, set_loop
+from Toxic.utils.inline.play import stream_markup
+from Toxic.utils.stream.autoclear import auto_clean
+from Toxic.utils.stream.live import live
+from Toxic.utils.stream.prefetch import prefetcher
+from Toxic.utils.thumbnails import get_thumb
+from strings import get_string
+
+IDLE = "idle"
+JOINING = "joining"
+PLAYING = "playing"
+PAUSED = "paused"
+SWITCHING = "switching"
+LEAVING = "leaving"
+
+
+def _calls():
+    from Toxic.core.call import Dev
+
+    return Dev
+
+
+class Armed:
+    """The entry after the current one, with its stream and now-playing card built."""
+
+    def __init__(self, entry: dict, link: str, stream, card: tuple):
+        self.entry = entry
+        self.link = link
+        self.stream = stream
+        self.card = card
+
+
+class Player:
+    """Playback state of one chat; every transition runs under ``lock``."""
+
+    def __init__(self, chat_id: int):
+        self.chat_id = chat_id
+        self.state = IDLE
+        self.lock = asyncio.Lock()
+        # Bumped whenever a new stream starts, to tell stale stream ends apart.
+        self.generation = 0
+        self.switched_at = 0.0
+        self.armed: Optional[Armed] = None
+        self.arming: Optional[Tuple[dict, asyncio.Task]] = None
+
+
+class Players:
+    """Serializes playback transitions per chat and publishes them as events.
+
+    Events are ``state`` (chat_id, old, new), ``track`` (chat_id, entry,
+    mystic, card) once a queue entry started playing and ``failed`` (chat_id,
+    entry, mystic, report) when it could not be started; ``report`` is False
+    when the caller tells the user itself. Subscribers run in the background,
+    after the transition that emitted them.
+
+    The entry after the current one is armed ahead of time: once it is on
+    disk its stream object, thumbnail and caption are built, so a stream end
+    only has to hand the stream to the call.
+    """
+
+    # A stream end this soon after a switch may belong to the stream that was replaced.
+    END_GRACE = 1.5
+
+    def __init__(self):
+        self._players: Dict[int, Player] = {}
+        self._subscribers: Dict[str, List[Callable[..., Awaitable]]] = {}
+        self.counts = Counter()
+        self.subscribe("track", self._announce)
+        self.subscribe("failed", self._report)
+        prefetcher.on_change(self.arm)
+
+    def get(self, chat_id: int) -> Player:
+        if chat_id not in self._players:
+            self._players[chat_id] = Player(chat_id)
+        return self._players[chat_id]
+
+    def state(self, chat_id: int) -> str:
+        player = self._players.get(chat_id)
+        return player.state if player else IDLE
+
+    def states(self) -> Counter:
+        return Counter(player.state for player in self._players.values())
+
+    def subscribe(self, event: str, func: Callable[..., Awaitable]) -> None:
+        self._subscribers.setdefault(event, []).append(func)
+
+    def _emit(self, event: str, chat_id: int, *args) -> None:
+        self.counts[event] += 1
+        for func in self._subscribers.get(event, []):
+            asyncio.create_task(self._deliver(func, event, chat_id, *args))
+
+    @staticmethod
+    async def _deliver(func: Callable[..., Awaitable], event: str, chat_id: int, *args) -> None:
+        try:
+            await func(chat_id, *args)
+        except Exception as e:
+            LOGGER(__name__).warning(f"Player {event} handler for {chat_id} failed: {e!r}")
+
+    def _set(self, player: Player, state: str) -> None:
+        old, player.state = player.state, state
+        if old != state:
+            self._emit("state", player.chat_id, old, state)
+
+    async def _settle(self, player: Player) -> None:
+        player.generation += 1
+        player.switched_at = time.monotonic()
+        self._set(player, PLAYING if await is_music_playing(player.chat_id) else PAUSED)
+
+    def idle(self, chat_id: int) -> None:
+        """Marks a chat idle after its call was left, whoever left it."""
+        self._set(self.get(chat_id), IDLE)
+
+    async def _switch(self, chat_id: int, func: Callable[..., Awaitable], *args):
+        player = self.get(chat_id)
+        async with player.lock:
+            previous = player.state
+            self._set(player, SWITCHING)
+            try:
+                result = await func(*args)
+            except BaseException:
+                self._set(player, previous)
+                raise
+            await self._settle(player)
+            return result
+
+    async def join(self, chat_id: int, original_chat_id: int, link, video=None, image=None) -> None:
+        player = self.get(chat_id)
+        async with player.lock:
+            previous = player.state
+            self._set(player, JOINING)
+            try:
+                await _calls().join_call(chat_id, original_chat_id, link, video=video, image=image)
+            except BaseException:
+                self._set(player, previous)
+                raise
+            await self._settle(player)
+
+    async def pause(self, chat_id: int) -> None:
+        player = self.get(chat_id)
+        async with player.lock:
+            await music_off(chat_id)
+            await _calls().pause_stream(chat_id)
+            self._set(player, PAUSED)
+
+    async def resume(self, chat_id: int) -> None:
+        player = self.get(chat_id)
+        async with player.lock:
+            await music_on(chat_id)
+            await _calls().resume_stream(chat_id)
+            self._set(player, PLAYING)
+
+    async def stop(self, chat_id: int) -> None:
+        player = self.get(chat_id)
+        async with player.lock:
+            await self._leave(player)
+
+    async def force_stop(self, chat_id: int) -> None:
+        """Drops the current entry and leaves the call, ahead of a forced play."""
+        player = self.get(chat_id)
+        async with player.lock:
+            self._set(player, LEAVING)
+            await _calls().force_stop_stream(chat_id)
+            self._set(player, IDLE)
+
+    async def _leave(self, player: Player) -> None:
+        self._set(player, LEAVING)
+        await _calls().stop_stream(player.chat_id)
+        self._set(player, IDLE)
+
+    async def seek(self, chat_id: int, file_path, to_seek, duration, mode) -> None:
+        await self._switch(chat_id, _calls().seek_stream, chat_id, file_path, to_seek, duration, mode)
+
+    async def speedup(self, chat_id: int, file_path, speed, playing) -> None:
+        await self._switch(chat_id, _calls().speedup_stream, chat_id, file_path, speed, playing)
+
+    async def skip(self, chat_id: int, count: int = 1) -> Optional[bool]:
+        """Drops ``count`` entries and starts the next one.
+
+        Returns whether the next entry started, or None when the queue ran out
+        and the call was left. A live entry that fails to start is left for
+        the caller to report.
+        """
+        player = self.get(chat_id)
+        async with player.lock:
+            check = db.get(chat_id)
+            for _ in range(count):
+                if not check:
+                    break
+                await auto_clean(check.pop(0))
+            if not check:
+                await self._leave(player)
+                return None
+            return await self._play_current(player, report="live_" not in str(check[0]["file"]))
+
+    async def replay(self, chat_id: int) -> bool:
+        player = self.get(chat_id)
+        async with player.lock:
+            if not db.get(chat_id):
+                return False
+            return await self._play_current(player, report="live_" not in str(db[chat_id][0]["file"]))
+
+    async def restream(
+        self, chat_id: int, link: str, video=None, file: Optional[str] = None, generation: Optional[int] = None
+    ) -> bool:
+        """Swaps ``link`` in for the current entry, as long as it is still ``file``.
+
+        With ``generation`` given, nothing happens if the stream was switched since.
+        """
+        player = self.get(chat_id)
+        async with player.lock:
+            if generation is not None and player.generation != generation:
+                return False
+            return await self._restream(player, link, video, file)
+
+    async def _restream(self, player: Player, link: str, video, file: Optional[str]) -> bool:
+        check = db.get(player.chat_id)
+        if not check or (file is not None and check[0]["file"] != file):
+            return False
+        previous = player.state
+        self._set(player, SWITCHING)
+        try:
+            await _calls().skip_stream(player.chat_id, link, video=video)
+        except BaseException:
+            self._set(player, previous)
+            raise
+        await self._settle(player)
+        return True
+
+    async def stream_ended(self, chat_id: int) -> None:
+        player = self.get(chat_id)
+        generation = player.generation
+        if time.monotonic() - player.switched_at < self.END_GRACE and await self._advancing(chat_id):
+            return
+        async with player.lock:
+            if player.generation != generation:
+                return
+            check = db.get(chat_id)
+            if check and "live_" in str(check[0]["file"]):
+                # The lock is held here, so the restart bypasses restream().
+                if await live.recover(chat_id, lambda *args: self._restream(player, *args)):
+                    return
+            popped = None
+            try:
+                loop = await get_loop(chat_id)
+                if loop == 0:
+                    popped = check.pop(0)
+                else:
+                    await set_loop(chat_id, loop - 1)
+            except Exception:
+                check = None
+            if not check:
+                try:
+                    await self._leave(player)
+                except Exception:
+                    pass
+            else:
+                await self._play_current(player)
+            # Cleanup waits until the next track is already playing.
+            await auto_clean(popped)
+
+    async def _advancing(self, chat_id: int) -> bool:
+        """Whether the call's played time still moves, i.e. a stream end was stale."""
+        try:
+            assistant = await group_assistant(_calls(), chat_id)
+            before = await assistant.played_time(chat_id)
+            await asyncio.sleep(self.END_GRACE)
+            return await assistant.played_time(chat_id) > before
+        except Exception:
+            return False
+
+    def arm(self, chat_id: int) -> None:
+        """Prepares db[chat_id][1] in the background, dropping anything armed before."""
+        check = db.get(chat_id)
+        upcoming = check[1] if check and len(check) > 1 else None
+        player = self.get(chat_id)
+        if upcoming is not None:
+            if player.armed and player.armed.entry is upcoming:
+                return
+            if player.arming and player.arming[0] is upcoming and not player.arming[1].done():
+                return
+        player.armed = None
+        if player.arming and not player.arming[1].done():
+            player.arming[1].cancel()
+        player.arming = None
+        if upcoming is not None:
+            player.arming = (upcoming, asyncio.create_task(self._arm(player, upcoming)))
+
+    async def _arm(self, player: Player, entry: dict) -> None:
+        queued, videoid = entry["file"], entry["vidid"]
+        video = True if str(entry["streamtype"]) == "video" else None
+        try:
+            if "live_" in queued:
+                # Live urls are resolved at switch time, they expire too soon to keep.
+                return
+            if "vid_" in queued:
+                await prefetcher.wait(player.chat_id)
+                link = YouTube.cached_track(videoid, video)
+                if link is None:
+                    return
+                link = str(link)
+            elif "index_" in queued:
+                link = videoid
+            else:
+                link = queued
+            stream = _calls().make_stream(link, video)
+            card = await self._card(player.chat_id, entry)
+            player.armed = Armed(entry, link, stream, card)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            LOGGER(__name__).warning(f"Could not arm {queued} in {player.chat_id}: {e!r}")
+
+    async def _play_current(self, player: Player, report: bool = True) -> bool:
+        chat_id = player.chat_id
+        entry = db[chat_id][0]
+        previous = player.state
+        self._set(player, SWITCHING)
+        entry["played"] = 0
+        if entry.get("old_dur"):
+            entry["dur"] = entry["old_dur"]
+            entry["seconds"] = entry["old_second"]
+            entry["speed_path"] = None
+            entry["speed"] = 1.0
+        queued = entry["file"]
+        videoid = entry["vidid"]
+        video = True if str(entry["streamtype"]) == "video" else None
+        mystic, card = None, None
+        armed, player.armed = player.armed, None
+        try:
+            if (
+                armed
+                and armed.entry is entry
+                and ("index_" in queued or os.path.isfile(armed.link))
+            ):
+                link, card = armed.link, armed.card
+                await _calls().skip_stream(chat_id, link, video=video, stream=armed.stream)
+            else:
+                if "live_" in queued:
+                    n, link = await YouTube.video(videoid, True)
+                    if n == 0:
+                        raise ValueError(link)
+                elif "vid_" in queued:
+                    if not YouTube.cached_track(videoid, video):
+                        _ = get_string(await get_lang(chat_id))
+                        mystic = await app.send_message(entry["chat_id"], _["call_7"])
+                    link, _direct = await YouTube.download(
+                        videoid,
+                        mystic,
+                        videoid=True,
+                        video=video,
+                        progressive=True,
+                    )
+                elif "index_" in queued:
+                    link = videoid
+                else:
+                    link = queued
+                await _calls().skip_stream(chat_id, link, video=video)
+        except Exception as e:
+            LOGGER(__name__).warning(f"Could not start {queued} in {chat_id}: {e!r}")
+            self._set(player, previous)
+            self._emit("failed", chat_id, entry, mystic, report)
+            return False
+        if "live_" in queued:
+            live.watch(chat_id, videoid, video, link)
+        await self._settle(player)
+        self._emit("track", chat_id, entry, mystic, card)
+        return True
+
+    @staticmethod
+    async def _card(chat_id: int, entry: dict) -> tuple:
+        """The now-playing photo, caption and markup kind of ``entry``."""
+        _ = get_string(await get_lang(chat_id))
+        queued, videoid, user = entry["file"], entry["vidid"], entry["by"]
+        title = entry["title"].title()
+        if "index_" in queued:
+            photo, caption, markup = config.STREAM_IMG_URL, _["stream_2"].format(user), "tg"
+        elif videoid in ("telegram", "soundcloud"):
+            if videoid == "soundcloud":
+                photo = config.SOUNCLOUD_IMG_URL
+            elif str(entry["streamtype"]) == "audio":
+                photo = config.TELEGRAM_AUDIO_URL
+            else:
+                photo = config.TELEGRAM_VIDEO_URL
+            caption = _["stream_1"].format(config.SUPPORT_CHAT, title[:23], entry["dur"], user)
+            markup = "tg"
+        else:
+            photo = await get_thumb(videoid)
+            caption = _["stream_1"].format(
+                f"https://t.me/{app.username}?start=info_{videoid}",
+                title[:23],
+                entry["dur"],
+                user,
+            )
+            markup = "tg" if "live_" in queued else "stream"
+        return photo, caption, markup
+
+    async def _announce(self, chat_id: int, entry: dict, mystic, card: Optional[tuple]) -> None:
+        photo, caption, markup = card or await self._card(chat_id, entry)
+        _ = get_string(await get_lang(chat_id))
+        button = stream_markup(_, chat_id)
+        if mystic:
+            try:
+                await mystic.delete()
+            except Exception:
+                pass
+        run = await app.send_photo(
+            chat_id=entry["chat_id"],
+            photo=photo,
+            caption=caption,
+            reply_markup=InlineKeyboardMarkup(button),
+        )
+        entry["mystic"] = run
+        entry["markup"] = markup
+
+    @staticmethod
+    async def _report(chat_id: int, entry: dict, mystic, report: bool) -> None:
+        if not report:
+            return
+        _ = get_string(await get_lang(chat_id))
+        if mystic:
+            await mystic.edit_text(_["call_6"], disable_web_page_preview=True)
+        else:
+            await app.send_message(entry["chat_id"], text=_["call_6"])
+
+
+players = Players()
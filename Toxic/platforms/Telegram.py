@@ -54,9 +54,7 @@ class TeleAPI:
             dur = seconds_to_min(filex.duration)
         except:
             try:
-                dur = await asyncio.get_event_loop().run_in_executor(
-                    None, check_duration, file_path
-                )
+                dur = await check_duration(file_path)
                 dur = seconds_to_min(dur)
             except:
                 return "Unknown"
@@ -1,15 +1,18 @@
 import asyncio
+import json
 import os
-import random
 import re
+import shutil
+import threading
 import time
 import uuid
 import aiofiles
 import httpx
 import yt_dlp
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Any, Optional, Union, List
+from typing import Any, AsyncIterator, Optional, Union, List
 from urllib.parse import unquote
 
 from pyrogram import errors
@@ -17,17 +20,52 @@ from pyrogram.enums import MessageEntityType
 from pyrogram.types import Message
 from youtubesearchpython.__future__ import VideosSearch
 from Toxic import app
+from Toxic.core.http import http
 from Toxic.logging import LOGGER
-from Toxic.utils.formatters import time_to_seconds
-from config import API_URL, API_KEY, DOWNLOADS_DIR
+from Toxic.misc import db
+from Toxic.utils.cache import TTLCache, bad_videos, meta_cache
+from Toxic.utils.exceptions import DownloadErr
+from Toxic.utils.formatters import seconds_to_min, time_to_seconds
+from Toxic.utils.inflight import InFlight
+from Toxic.utils.ratelimit import BACKGROUND, RateLimited, governor
+from Toxic.utils.scheduler import scheduler
+from Toxic.utils.sources import Scoreboard, hedged
+from Toxic.utils import ytdlp
+from Toxic.utils.stream.progressive import GrowingFile, progressive
+from Toxic.utils.stream.transcode import transcoder
+from config import API_URL, API_KEY, DOWNLOADS_DIR, PROGRESSIVE_PREFIX
 
 # ---------- Configuration ----------
 PROXY_LIST_ENV = os.getenv("YTDL_PROXIES", "")
 SERVER_RELAY = os.getenv("https://toxicapi.vercel.app/api/proxy?url=", "")
 MAX_NETWORK_RETRIES = int(os.getenv("YTDL_MAX_RETRIES", "3"))
+MAX_DOWNLOAD_ATTEMPTS = int(os.getenv("YTDL_MAX_ATTEMPTS", "12"))
 HTTPX_TIMEOUT = int(os.getenv("YTDL_HTTP_TIMEOUT", "90"))
+TRACK_CACHE_LIMIT = int(os.getenv("TRACK_CACHE_LIMIT", str(5 * 1024 ** 3)))
+YTDL_WORKERS = int(os.getenv("YTDL_WORKERS", "2"))
+YTDL_QUEUE_SIZE = int(os.getenv("YTDL_QUEUE_SIZE", "16"))
+YTDL_JOB_TIMEOUT = int(os.getenv("YTDL_JOB_TIMEOUT", "45"))
+STREAM_URL_MARGIN = int(os.getenv("YTDL_URL_MARGIN", "300"))
+STREAM_URL_REFRESH = int(os.getenv("YTDL_URL_REFRESH", "120"))
+STREAM_URL_DEFAULT_TTL = int(os.getenv("YTDL_URL_DEFAULT_TTL", "1800"))
+HEDGE_DELAY = float(os.getenv("YTDL_HEDGE_DELAY", "3"))
+DOWNLOAD_HEDGE_DELAY = float(os.getenv("YTDL_DOWNLOAD_HEDGE_DELAY", "10"))
+SOURCE_EJECT_AFTER = int(os.getenv("YTDL_SOURCE_EJECT_AFTER", "3"))
+SOURCE_EJECT_FOR = int(os.getenv("YTDL_SOURCE_EJECT_FOR", "60"))
+DOWNLOAD_SEGMENTS = int(os.getenv("YTDL_DOWNLOAD_SEGMENTS", "4"))
+SEGMENT_MIN_SIZE = int(os.getenv("YTDL_SEGMENT_MIN_SIZE", str(16 * 1024 ** 2)))
+DOWNLOAD_CONNECTIONS = int(os.getenv("YTDL_DOWNLOAD_CONNECTIONS", "16"))
+YTDL_HTTP_CHUNK = int(os.getenv("YTDL_HTTP_CHUNK", str(10 * 1024 ** 2)))
 # ---------- End config ----------
 
+# Finished tracks are stored as "<video id>.<audio|video>.<format>.<ext>";
+# anything still being written carries ".part" in its name.
+TRACK_CACHE_REGEX = re.compile(r"^[\w-]{11}\.(?:audio|video)\.[\w.-]+$")
+# Caps ranged connections opened by segmented downloads across all files.
+_segment_slots = asyncio.Semaphore(DOWNLOAD_CONNECTIONS)
+# googlevideo urls carry their expiry as "expire=<ts>" or "/expire/<ts>/" for manifests.
+EXPIRE_REGEX = re.compile(r"[?&/]expire[=/](\d+)")
+
 @dataclass
 class DownloadResult:
     success: bool
@@ -37,31 +75,41 @@ class DownloadResult:
 class YouTubeAPI:
     DEFAULT_TIMEOUT = 120
     DEFAULT_DOWNLOAD_TIMEOUT = 120
-    CHUNK_SIZE = 8192
+    CHUNK_SIZE = 64 * 1024
+    MAX_CHUNK_SIZE = 1024 * 1024
     MAX_RETRIES = 2
     BACKOFF_FACTOR = 1.0
     BASE_URL = "https://www.youtube.com/watch?v="
     PLAYLIST_BASE = "https://youtube.com/playlist?list="
     REGEX = r"(?:youtube\.com|youtu\.be)"
+    ID_REGEX = r"(?:v=|youtu\.be\/|shorts\/|live\/|embed\/)([\w-]{11})"
+    AUDIO_FORMAT = "bestaudio/best"
+    VIDEO_FORMAT = "best[height<=?720][width<=?1280]"
     STATUS_URL = "https://www.youtube.com/oembed?url="
 
     def __init__(self, timeout: int = DEFAULT_TIMEOUT, download_timeout: int = DEFAULT_DOWNLOAD_TIMEOUT, max_redirects: int = 0):
         self._timeout = timeout
         self._download_timeout = download_timeout
         self._max_redirects = max_redirects
-        self._session = httpx.AsyncClient(
-            timeout=httpx.Timeout(connect=self._timeout, read=self._timeout, write=self._timeout, pool=self._timeout),
-            follow_redirects=max_redirects > 0,
-            max_redirects=max_redirects,
-        )
         self._regex = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
         self._proxies = self._parse_proxies(PROXY_LIST_ENV)
+        self._inflight = InFlight()
+        self._pool = ytdlp.YtDlpPool(YTDL_WORKERS, YTDL_QUEUE_SIZE, YTDL_JOB_TIMEOUT)
+        self._stream_urls = TTLCache(1024, STREAM_URL_DEFAULT_TTL)
+        self._refreshers: dict = {}
+        self._scores = Scoreboard(eject_after=SOURCE_EJECT_AFTER, eject_for=SOURCE_EJECT_FOR)
+        self._growing: dict = {}
+        self._background: set = set()
 
-    async def close(self) -> None:
-        try:
-            await self._session.aclose()
-        except Exception as e:
-            LOGGER(__name__).error("Error closing HTTP session: %s", repr(e))
+    def start_workers(self) -> None:
+        self._pool.start()
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+    @property
+    def _session(self) -> httpx.AsyncClient:
+        return http.client()
 
     @staticmethod
     def _parse_proxies(proxy_env: str) -> List[str]:
@@ -69,10 +117,21 @@ class YouTubeAPI:
             return []
         return [p.strip() for p in proxy_env.split(",") if p.strip()]
 
+    def unplayable(self, video_id: str) -> Optional[str]:
+        """The failure class if ``video_id`` failed recently, else None."""
+        return bad_videos.get(video_id)
+
+    def inflight_waiters(self) -> dict:
+        return self._inflight.waiters()
+
+    def source_scores(self) -> dict:
+        return self._scores.snapshot()
+
     def _choose_proxy(self) -> Optional[str]:
         if not self._proxies:
             return None
-        return random.choice(self._proxies)
+        proxy = self._scores.pick([f"proxy:{p}" for p in self._proxies])
+        return proxy[len("proxy:"):]
 
     def _get_headers(self, url: str, base_headers: dict[str, str]) -> dict[str, str]:
         headers = base_headers.copy()
@@ -81,38 +140,196 @@ class YouTubeAPI:
         headers.setdefault("User-Agent", "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115 Safari/537.36")
         return headers
 
+    async def make_request(self, url: str, max_retries: int = MAX_NETWORK_RETRIES) -> Optional[dict]:
+        headers = self._get_headers(url, {})
+        for attempt in range(max_retries):
+            try:
+                response = await self._session.get(
+                    url,
+                    headers=headers,
+                    timeout=self._timeout,
+                    follow_redirects=self._max_redirects > 0,
+                )
+                response.raise_for_status()
+                return response.json()
+            except Exception as e:
+                LOGGER(__name__).warning("Request to %s failed: %s", url, repr(e))
+            await asyncio.sleep(self.BACKOFF_FACTOR * (attempt + 1))
+        return None
+
     # -------------------------
     # File Download
     # -------------------------
+    @staticmethod
+    def _content_range(response: httpx.Response) -> tuple[Optional[int], Optional[int]]:
+        match = re.match(r"bytes (?:(\d+)-\d+|\*)/(\d+|\*)", response.headers.get("Content-Range", ""))
+        if not match:
+            return None, None
+        start, total = match.groups()
+        return (int(start) if start else None), (int(total) if total != "*" else None)
+
+    def _chunk_size(self, length: Optional[int]) -> int:
+        # Aim for a few hundred writes per body, within [CHUNK_SIZE, MAX_CHUNK_SIZE].
+        if not length:
+            return self.CHUNK_SIZE
+        return max(self.CHUNK_SIZE, min(self.MAX_CHUNK_SIZE, length // 256))
+
+    @staticmethod
+    def _target_path(response: httpx.Response, url: str) -> Path:
+        cd = response.headers.get("Content-Disposition", "")
+        match = re.search(r'filename="?([^"]+)"?', cd)
+        filename = unquote(match[1]) if match else (Path(url).name or uuid.uuid4().hex)
+        return Path(DOWNLOADS_DIR) / filename
+
     async def download_file(self, url: str, file_path: Optional[Union[str, Path]] = None, overwrite: bool = False, use_proxy: Optional[str] = None, **kwargs: Any) -> DownloadResult:
+        """Downloads ``url`` into ``<path>.part`` and renames it once complete.
+
+        A dropped transfer is resumed with a Range request instead of starting
+        over. Only attempts that push the ``.part`` file past its previous
+        high-water mark are forgiven, and MAX_DOWNLOAD_ATTEMPTS caps the total.
+        """
         if not url:
             return DownloadResult(success=False, error="Empty URL provided")
         headers = self._get_headers(url, kwargs.pop("headers", {}))
-        proxies = {"all://": use_proxy} if use_proxy else None
-        for attempt in range(MAX_NETWORK_RETRIES):
-            try:
-                async with httpx.AsyncClient(timeout=HTTPX_TIMEOUT, proxies=proxies) as client:
-                    async with client.stream("GET", url, timeout=self._download_timeout, headers=headers) as response:
-                        response.raise_for_status()
-                        if file_path is None:
-                            cd = response.headers.get("Content-Disposition", "")
-                            match = re.search(r'filename="?([^"]+)"?', cd)
-                            filename = unquote(match[1]) if match else (Path(url).name or uuid.uuid4().hex)
-                            path = Path(DOWNLOADS_DIR) / filename
+        # Content-Length and Range offsets refer to the bytes on the wire.
+        headers["Accept-Encoding"] = "identity"
+        client = http.client(use_proxy)
+        timeout = httpx.Timeout(HTTPX_TIMEOUT, read=self._download_timeout)
+        path = Path(file_path) if file_path is not None else None
+        if path and path.exists() and not overwrite:
+            return DownloadResult(success=True, file_path=path)
+        validator, last_err, attempt, tries = None, None, 0, 0
+        mark, restarted, part = None, False, None
+        try:
+            while attempt < MAX_NETWORK_RETRIES and tries < MAX_DOWNLOAD_ATTEMPTS:
+                tries += 1
+                part = path.with_name(path.name + ".part") if path else None
+                offset = part.stat().st_size if part and part.exists() else 0
+                if mark is None:
+                    mark = offset
+                request_headers = dict(headers)
+                if offset:
+                    request_headers["Range"] = f"bytes={offset}-"
+                    if validator:
+                        request_headers["If-Range"] = validator
+                segmented = False
+                try:
+                    async with client.stream("GET", url, timeout=timeout, headers=request_headers) as response:
+                        if response.status_code == 416:
+                            _, total = self._content_range(response)
+                            if total != offset:
+                                part.unlink(missing_ok=True)
+                                raise ValueError(f"Range {offset}- not satisfiable for {total} bytes")
                         else:
-                            path = Path(file_path) if isinstance(file_path, str) else file_path
-                        if path.exists() and not overwrite:
-                            return DownloadResult(success=True, file_path=path)
-                        path.parent.mkdir(parents=True, exist_ok=True)
-                        async with aiofiles.open(path, "wb") as f:
-                            async for chunk in response.aiter_bytes(self.CHUNK_SIZE):
-                                await f.write(chunk)
-                        return DownloadResult(success=True, file_path=path)
-            except Exception as e:
-                last_err = repr(e)
-            await asyncio.sleep(1 + attempt * 2)
+                            response.raise_for_status()
+                            if path is None:
+                                path = self._target_path(response, url)
+                                if path.exists() and not overwrite:
+                                    return DownloadResult(success=True, file_path=path)
+                                part = path.with_name(path.name + ".part")
+                            etag = response.headers.get("ETag")
+                            # If-Range only accepts strong validators.
+                            validator = etag if etag and not etag.startswith("W/") else response.headers.get("Last-Modified")
+                            if response.status_code == 206:
+                                start, total = self._content_range(response)
+                                if start != offset:
+                                    raise ValueError(f"Asked for offset {offset}, got {start}")
+                                mode = "ab"
+                            else:
+                                # Full body: the server ignored the range or the file changed.
+                                if offset and not restarted:
+                                    # Start over once; later full bodies must beat the old mark to count.
+                                    restarted, mark = True, 0
+                                length = response.headers.get("Content-Length")
+                                total = int(length) if length and length.isdigit() else None
+                                mode = "wb"
+                            path.parent.mkdir(parents=True, exist_ok=True)
+                            segmented = (
+                                mode == "wb"
+                                and DOWNLOAD_SEGMENTS > 1
+                                and (total or 0) >= SEGMENT_MIN_SIZE
+                                and response.headers.get("Accept-Ranges") == "bytes"
+                            )
+                            if not segmented:
+                                async with aiofiles.open(part, mode) as f:
+                                    async for chunk in response.aiter_bytes(self._chunk_size(total)):
+                                        await f.write(chunk)
+                    if segmented:
+                        try:
+                            await self._download_segments(client, url, headers, validator, timeout, part, total)
+                        except BaseException:
+                            # A preallocated file has the full size and would look complete on resume.
+                            part.unlink(missing_ok=True)
+                            raise
+                    size = part.stat().st_size
+                    if total is not None and size != total:
+                        if size > total:
+                            part.unlink(missing_ok=True)
+                        raise IOError(f"Got {size} of {total} bytes")
+                    os.replace(part, path)
+                    return DownloadResult(success=True, file_path=path)
+                except Exception as e:
+                    last_err = repr(e)
+                size = part.stat().st_size if part and part.exists() else 0
+                if size > mark:
+                    mark = size
+                else:
+                    attempt += 1
+                await asyncio.sleep(1 + attempt * 2)
+        except asyncio.CancelledError:
+            # Nothing resumes a cancelled download, and _prune_cache leaves .part files alone.
+            if part:
+                part.unlink(missing_ok=True)
+            raise
         return DownloadResult(success=False, error=f"Failed to download {url}: {last_err}")
 
+    async def _download_segments(self, client: httpx.AsyncClient, url: str, headers: dict, validator: Optional[str], timeout: httpx.Timeout, part: Path, total: int) -> None:
+        """Fetches ``total`` bytes as DOWNLOAD_SEGMENTS concurrent ranges into a preallocated ``part``."""
+        with open(part, "wb") as f:
+            f.truncate(total)
+        size = -(-total // DOWNLOAD_SEGMENTS)
+        segments = [(start, min(start + size, total) - 1) for start in range(0, total, size)]
+        tasks = [
+            asyncio.create_task(self._fetch_segment(client, url, headers, validator, timeout, part, start, end))
+            for start, end in segments
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch_segment(self, client: httpx.AsyncClient, url: str, headers: dict, validator: Optional[str], timeout: httpx.Timeout, part: Path, start: int, end: int) -> None:
+        pos, attempt = start, 0
+        chunk_size = self._chunk_size(end + 1 - start)
+        while pos <= end:
+            request_headers = dict(headers, Range=f"bytes={pos}-{end}")
+            if validator:
+                request_headers["If-Range"] = validator
+            received = 0
+            try:
+                async with _segment_slots:
+                    async with client.stream("GET", url, timeout=timeout, headers=request_headers) as response:
+                        if response.status_code != 206 or self._content_range(response)[0] != pos:
+                            raise ValueError(f"Range {pos}-{end} answered with {response.status_code}")
+                        async with aiofiles.open(part, "r+b") as f:
+                            await f.seek(pos)
+                            async for chunk in response.aiter_bytes(chunk_size):
+                                chunk = chunk[: end + 1 - pos]
+                                await f.write(chunk)
+                                pos += len(chunk)
+                                received += len(chunk)
+                                if pos > end:
+                                    break
+                if pos <= end:
+                    raise IOError(f"Range {start}-{end} ended at {pos}")
+            except Exception:
+                if not received:
+                    attempt += 1
+                if attempt >= MAX_NETWORK_RETRIES:
+                    raise
+                await asyncio.sleep(1 + attempt * 2)
+
     # -------------------------
     # API Download
     # -------------------------
@@ -148,25 +365,248 @@ class YouTubeAPI:
         except Exception:
             return None
 
+    # -------------------------
+    # Track Cache
+    # -------------------------
+    @staticmethod
+    def _cache_stem(video_id: str, video: bool = False, format_id: Optional[str] = None) -> str:
+        kind = "video" if video else "audio"
+        fmt = re.sub(r"[^\w-]", "", str(format_id)) if format_id else "best"
+        return f"{video_id}.{kind}.{fmt}"
+
+    @staticmethod
+    def is_cached_track(path: Union[str, Path]) -> bool:
+        path = Path(path)
+        return path.parent == Path(DOWNLOADS_DIR) and ".part" not in path.name and bool(TRACK_CACHE_REGEX.match(path.name))
+
+    def cached_track(self, video_id: str, video: bool = False, format_id: Optional[str] = None) -> Optional[Path]:
+        stem = self._cache_stem(video_id, video, format_id)
+        for path in Path(DOWNLOADS_DIR).glob(f"{stem}.*"):
+            if ".part" not in path.name and not transcoder.is_variant(path) and path.stat().st_size > 0:
+                return path
+        return None
+
+    def _store_track(self, source: Path, stem: str) -> Path:
+        final = Path(DOWNLOADS_DIR) / f"{stem}{source.suffix}"
+        part = Path(DOWNLOADS_DIR) / f"{stem}.part-{uuid.uuid4().hex}"
+        shutil.move(str(source), part)
+        os.replace(part, final)
+        return final
+
+    def _prune_cache(self, in_use: set) -> None:
+        """Evicts the oldest cached tracks over TRACK_CACHE_LIMIT.
+
+        ``in_use`` holds the video ids queued or playing anywhere; their
+        normalized variants may be what a call is streaming right now.
+        """
+        from config import autoclean
+
+        files = []
+        for path in Path(DOWNLOADS_DIR).iterdir():
+            if self.is_cached_track(path):
+                st = path.stat()
+                files.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= TRACK_CACHE_LIMIT:
+                break
+            if str(path) in autoclean:
+                continue
+            if transcoder.is_variant(path) and path.name.split(".", 1)[0] in in_use:
+                continue
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+
+    def _ytdlp_download(self, link: str, stem: str, fmt: str, cancel: Optional[threading.Event] = None) -> Path:
+        def check_cancel(d):
+            if cancel is not None and cancel.is_set():
+                raise yt_dlp.utils.DownloadCancelled()
+            growing = self._growing.get(stem)
+            if growing is not None:
+                growing.update_threadsafe(
+                    d.get("filename") if d.get("status") == "finished" else d.get("tmpfilename"),
+                    d.get("downloaded_bytes"),
+                    d.get("total_bytes") or d.get("total_bytes_estimate"),
+                    (d.get("info_dict") or {}).get("duration"),
+                )
+
+        tmp = f"{stem}.part-{uuid.uuid4().hex}"
+        opts = {
+            "progress_hooks": [check_cancel],
+            "format": fmt,
+            # Chunked range requests dodge per-connection throttling; DASH/HLS fragments go in parallel.
+            "http_chunk_size": YTDL_HTTP_CHUNK,
+            "concurrent_fragment_downloads": DOWNLOAD_SEGMENTS,
+            "outtmpl": str(Path(DOWNLOADS_DIR) / f"{tmp}.%(ext)s"),
+            "geo_bypass": True,
+            "nocheckcertificate": True,
+            "noplaylist": True,
+            "quiet": True,
+            "no_warnings": True,
+        }
+        try:
+            with yt_dlp.YoutubeDL(opts) as ydl:
+                info = ydl.extract_info(link, download=True)
+                requested = info.get("requested_downloads") or [{}]
+                filepath = requested[0].get("filepath") or ydl.prepare_filename(info)
+        except BaseException:
+            for leftover in Path(DOWNLOADS_DIR).glob(f"{tmp}*"):
+                leftover.unlink(missing_ok=True)
+            raise
+        return self._store_track(Path(filepath), stem)
+
+    def _video_id(self, link: str) -> str:
+        match = re.search(self.ID_REGEX, link)
+        if match:
+            return match[1]
+        return uuid.uuid5(uuid.NAMESPACE_URL, link).hex[:11]
+
+    async def download(
+        self,
+        link: str,
+        mystic=None,
+        video: Union[bool, str] = None,
+        videoid: Union[bool, str] = None,
+        format_id: Optional[str] = None,
+        progressive: bool = False,
+    ) -> tuple[str, bool]:
+        """Returns ``(path, True)`` for a downloaded file.
+
+        With ``progressive`` a track that isn't cached yet may instead come
+        back as ``(url, False)``: a local URL streaming the file while it is
+        still downloading, returned once PROGRESSIVE_PREFIX seconds are on disk.
+        """
+        if videoid:
+            link = self.BASE_URL + link
+        if "&" in link:
+            link = link.split("&")[0]
+        video_id = self._video_id(link)
+        is_video = bool(video)
+        cached = self.cached_track(video_id, is_video, format_id)
+        if cached:
+            os.utime(cached)
+            transcoder.schedule(cached, is_video)
+            return str(cached), True
+        # A transient mark only steers playlist resolution; the track asked for now is always retried.
+        failure = bad_videos.permanent(video_id)
+        if failure:
+            raise DownloadErr(f"Skipping {video_id}: {failure}")
+        key = ("download", video_id, is_video, format_id)
+        if progressive and PROGRESSIVE_PREFIX > 0 and not format_id:
+            return await self._progressive(key, link, video_id, is_video)
+        path = await self._inflight.run(key, self._fetch_track, link, video_id, is_video, format_id)
+        return str(path), True
+
+    async def _progressive(self, key: tuple, link: str, video_id: str, is_video: bool) -> tuple[str, bool]:
+        stem = self._cache_stem(video_id, is_video)
+        growing = self._growing.get(stem)
+        if growing is None:
+            growing = self._growing[stem] = GrowingFile()
+        task = asyncio.ensure_future(self._inflight.run(key, self._fetch_track, link, video_id, is_video, None))
+        self._background.add(task)
+
+        def finished(t: asyncio.Task) -> None:
+            self._background.discard(t)
+            if self._growing.get(stem) is growing:
+                del self._growing[stem]
+            if t.cancelled() or t.exception() is not None:
+                growing.fail()
+            else:
+                growing.finish(t.result())
+
+        task.add_done_callback(finished)
+        while not task.done():
+            if growing.path and growing.written >= growing.prefix_bytes(PROGRESSIVE_PREFIX):
+                return await progressive.url(growing), False
+            await asyncio.wait({task}, timeout=0.25)
+        return str(task.result()), True
+
+    async def _fetch_track(self, link: str, video_id: str, is_video: bool, format_id: Optional[str]) -> Path:
+        stem = self._cache_stem(video_id, is_video, format_id)
+        fmt = format_id or (self.VIDEO_FORMAT if is_video else self.AUDIO_FORMAT)
+
+        async def from_api() -> Optional[Path]:
+            api_path = await self.download_with_api(video_id, is_video)
+            if api_path and api_path.exists():
+                return await asyncio.to_thread(self._store_track, api_path, stem)
+            return None
+
+        async def from_ytdlp() -> Path:
+            cancel = threading.Event()
+            await governor.acquire("ytdlp")
+            try:
+                return await asyncio.to_thread(self._ytdlp_download, link, stem, fmt, cancel)
+            finally:
+                cancel.set()
+
+        sources = {"ytdlp": from_ytdlp}
+        # A progressive reader follows the yt-dlp file, so don't race it against the API.
+        if not format_id and API_URL and API_KEY and stem not in self._growing:
+            sources["api"] = from_api
+        attempts = [
+            partial(self._scores.timed, name, sources[name], excused=self._source_excused)
+            for name in self._scores.rank(list(sources))
+        ]
+        try:
+            path = await hedged(attempts, DOWNLOAD_HEDGE_DELAY)
+        except Exception as e:
+            kind = bad_videos.mark(video_id, repr(e))
+            raise DownloadErr(f"Failed to download {video_id} ({kind}): {e!r}")
+        if path is None:
+            bad_videos.mark(video_id)
+            raise DownloadErr(f"Failed to download {video_id}")
+        in_use = {entry.get("vidid") for queue in list(db.values()) for entry in list(queue)}
+        await asyncio.to_thread(self._prune_cache, in_use)
+        transcoder.schedule(path, is_video)
+        return path
+
     # -------------------------
     # YouTube Info
     # -------------------------
+    def _query_key(self, link: str) -> str:
+        if re.search(self.REGEX, link):
+            match = re.search(self.ID_REGEX, link)
+            if match:
+                return match[1]
+        return " ".join(link.lower().split())
+
     async def details(self, link: str, videoid: Union[bool, str] = None) -> dict:
         if videoid:
             link = self.BASE_URL + link
         if "&" in link:
             link = link.split("&")[0]
+        key = self._query_key(link)
+        info = await meta_cache.get(key)
+        if info:
+            return info
+        try:
+            return await self._inflight.run(("details", key), self._search, link, key)
+        except RateLimited:
+            # We may have joined a background lookup that got dropped; retry at our own priority.
+            if governor.current() == BACKGROUND:
+                raise
+            return await self._inflight.run(("details", key), self._search, link, key)
+
+    async def _search(self, link: str, key: Optional[str] = None) -> dict:
+        await governor.acquire("search")
         results = VideosSearch(link, limit=1)
         result = (await results.next())["result"][0]
         duration_min = result["duration"]
         duration_sec = 0 if str(duration_min) == "None" else int(time_to_seconds(duration_min))
-        return {
+        info = {
             "title": result["title"],
             "duration_min": duration_min,
             "duration_sec": duration_sec,
             "thumbnail": result["thumbnails"][0]["url"].split("?")[0],
             "id": result["id"],
+            "views": (result.get("viewCount") or {}).get("short"),
+            "channel": (result.get("channel") or {}).get("name"),
         }
+        await meta_cache.set(info, query=key)
+        return info
 
     async def title(self, link: str, videoid: Union[bool, str] = None) -> str:
         return (await self.details(link, videoid))["title"]
@@ -179,22 +619,53 @@ class YouTubeAPI:
 
     async def track(self, link: str, videoid: Union[bool, str] = None) -> tuple[dict, str]:
         info = await self.details(link, videoid)
-        return info, info["id"]
+        track_details = {
+            "title": info["title"],
+            "link": self.BASE_URL + info["id"],
+            "vidid": info["id"],
+            "duration_min": info["duration_min"],
+            "thumb": info["thumbnail"],
+        }
+        return track_details, info["id"]
 
     # -------------------------
     # Direct Stream URL
     # -------------------------
     async def _yt_dlp_get_stream(self, link: str, proxy: Optional[str] = None, prefer_video: bool = False) -> tuple[bool, Optional[str]]:
+        key = ("stream", self._query_key(link), proxy, prefer_video)
+        return await self._inflight.run(key, self._yt_dlp_resolve, link, proxy, prefer_video)
+
+    async def _yt_dlp_resolve(self, link: str, proxy: Optional[str] = None, prefer_video: bool = False) -> tuple[bool, Optional[str]]:
+        fmt = self.VIDEO_FORMAT if prefer_video else self.AUDIO_FORMAT
+        try:
+            await governor.acquire("ytdlp")
+            return True, await self._pool.run(ytdlp.resolve, link, fmt, proxy)
+        except ytdlp.PoolUnavailable:
+            return await self._yt_dlp_cli(link, proxy, prefer_video)
+        except asyncio.TimeoutError:
+            return False, "yt-dlp timed out"
+        except Exception as e:
+            return False, repr(e)
+
+    @staticmethod
+    def _source_ok(result: tuple[int, str]) -> bool:
+        # A private or removed video is not the source's fault.
+        return result[0] == 1 or bad_videos.classify(result[1]) != bad_videos.TRANSIENT
+
+    @staticmethod
+    def _source_excused(error: Exception) -> bool:
+        return bad_videos.classify(repr(error)) != bad_videos.TRANSIENT
+
+    async def _yt_dlp_cli(self, link: str, proxy: Optional[str] = None, prefer_video: bool = False) -> tuple[bool, Optional[str]]:
         args = ["yt-dlp", "--no-warnings", "--no-check-certificate", "--geo-bypass", "-g"]
-        args += ["-f", "best[height<=?720][width<=?1280]"] if prefer_video else ["-f", "bestaudio/best"]
+        args += ["-f", self.VIDEO_FORMAT if prefer_video else self.AUDIO_FORMAT]
         args.append(link)
         env = os.environ.copy()
         if proxy:
             env["HTTP_PROXY"] = proxy
             env["HTTPS_PROXY"] = proxy
         try:
-            proc = await asyncio.create_subprocess_exec(*args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, env=env)
-            stdout, stderr = await proc.communicate()
+            _, stdout, stderr = await scheduler.run("ytdlp", *args, env=env)
             out_text, err_text = stdout.decode().strip(), stderr.decode().strip()
             if out_text:
                 return True, out_text.splitlines()[0].strip()
@@ -202,37 +673,140 @@ class YouTubeAPI:
         except Exception as e:
             return False, repr(e)
 
-    async def video(self, link: str, videoid: Union[bool, str] = None) -> tuple[int, str]:
+    @staticmethod
+    def url_expires(url: str) -> Optional[int]:
+        """Unix time a googlevideo url stops working, if it says so."""
+        match = EXPIRE_REGEX.search(url)
+        return int(match[1]) if match else None
+
+    @classmethod
+    def _url_ttl(cls, url: str) -> int:
+        expires = cls.url_expires(url)
+        if expires is None:
+            return STREAM_URL_DEFAULT_TTL
+        return expires - int(time.time()) - STREAM_URL_MARGIN
+
+    def _remember_stream(self, key: tuple, url: str) -> None:
+        ttl = self._url_ttl(url)
+        if ttl > 0:
+            self._stream_urls.set(key, url, ttl)
+
+    def _refresh_soon(self, key: tuple, link: str) -> None:
+        """Re-resolves a cached url in the background once it is served close to expiry."""
+        expires = self._stream_urls.expires(key)
+        if key in self._refreshers or expires is None or expires - time.time() > STREAM_URL_REFRESH:
+            return
+        self._refreshers[key] = asyncio.create_task(self._refresh_stream(key, link))
+
+    async def _refresh_stream(self, key: tuple, link: str) -> None:
+        try:
+            n, url = await self._resolve_video(link)
+            if n:
+                self._remember_stream(key, url)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            LOGGER(__name__).warning(f"Refreshing stream url of {key[0]} failed: {e!r}")
+        finally:
+            self._refreshers.pop(key, None)
+
+    async def video(self, link: str, videoid: Union[bool, str] = None, fresh: bool = False) -> tuple[int, str]:
         if videoid:
             link = self.BASE_URL + link
         if "&" in link:
             link = link.split("&")[0]
-        ok, result = await self._yt_dlp_get_stream(link, proxy=None, prefer_video=True)
-        if ok:
-            return 1, result
+        key = (self._video_id(link), "video")
+        url = None if fresh else self._stream_urls.get(key)
+        if url:
+            self._refresh_soon(key, link)
+            return 1, url
+        failure = bad_videos.permanent(key[0])
+        if failure:
+            return 0, f"Skipping {key[0]}: {failure}"
+        n, result = await self._resolve_video(link)
+        if n:
+            self._remember_stream(key, result)
+        else:
+            bad_videos.mark(key[0], result)
+        return n, result
+
+    async def _resolve_video(self, link: str) -> tuple[int, str]:
+        async def direct(proxy: Optional[str] = None) -> tuple[int, str]:
+            ok, result = await self._yt_dlp_get_stream(link, proxy=proxy, prefer_video=True)
+            if not ok and bad_videos.classify(result) != bad_videos.TRANSIENT:
+                bad_videos.mark(self._video_id(link), result)
+            return (1 if ok else 0), result
+
+        async def relay() -> tuple[int, str]:
+            relay_url = SERVER_RELAY + link
+            r = await self._session.head(relay_url, timeout=10)
+            if r.status_code in (200, 302, 303):
+                return 1, relay_url
+            return 0, f"Relay answered {r.status_code}"
+
+        ok = lambda r: r[0] == 1
+        sources = {"direct": direct}
         proxy = self._choose_proxy()
         if proxy:
-            ok2, res2 = await self._yt_dlp_get_stream(link, proxy=proxy, prefer_video=True)
-            if ok2:
-                return 1, res2
+            sources[f"proxy:{proxy}"] = partial(direct, proxy)
         if SERVER_RELAY:
-            relay_url = SERVER_RELAY + link
-            try:
-                r = await self._session.head(relay_url, timeout=10)
-                if r.status_code in (200, 302, 303):
-                    return 1, relay_url
-            except:
-                pass
-        return 0, result or "Unable to get direct stream URL"
+            sources["relay"] = relay
+        attempts = [
+            partial(self._scores.timed, name, sources[name], self._source_ok)
+            for name in self._scores.rank(list(sources))
+        ]
+        try:
+            result = await hedged(attempts, HEDGE_DELAY, ok=ok)
+        except Exception as e:
+            return 0, repr(e)
+        return result or (0, "Unable to get direct stream URL")
+
+    @staticmethod
+    def _flat_info(entry: dict) -> dict:
+        duration = entry.get("duration")
+        thumbnails = [t for t in entry.get("thumbnails") or [] if t.get("url")]
+        if thumbnails:
+            thumbnail = thumbnails[-1]["url"].split("?")[0]
+        else:
+            thumbnail = f"https://i.ytimg.com/vi/{entry['id']}/hqdefault.jpg"
+        views = entry.get("view_count")
+        return {
+            "title": entry["title"],
+            "duration_min": seconds_to_min(duration) if duration else None,
+            "duration_sec": int(duration or 0),
+            "thumbnail": thumbnail,
+            "id": entry["id"],
+            "views": f"{views:,} views" if views else None,
+            "channel": entry.get("channel") or entry.get("uploader"),
+        }
 
-    async def playlist(self, link: str, limit: int, user_id: int, videoid: Union[bool, str] = None) -> list[str]:
+    async def playlist(self, link: str, limit: int, user_id: int, videoid: Union[bool, str] = None) -> AsyncIterator[dict]:
         if videoid:
             link = self.PLAYLIST_BASE + link
         if "&" in link:
             link = link.split("&")[0]
-        proc = await asyncio.create_subprocess_shell(
-            f"yt-dlp -i --get-id --flat-playlist --playlist-end {limit} --skip-download {link}",
-            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
-        )
-        out, _ = await proc.communicate()
-        return [key for key in out.decode("utf-8").split("\n") if key]
+        await governor.acquire("ytdlp")
+        async with scheduler.spawn(
+            "ytdlp",
+            "yt-dlp", "-i", "--flat-playlist", "--playlist-end", str(limit), "-j", link,
+            stderr=asyncio.subprocess.DEVNULL, limit=2 ** 20,
+        ) as proc:
+            while True:
+                # Bound the wait per entry rather than for the whole listing.
+                try:
+                    line = await asyncio.wait_for(proc.stdout.readline(), scheduler.timeouts["ytdlp"])
+                except asyncio.TimeoutError:
+                    LOGGER(__name__).warning(f"Playlist listing of {link} stalled, stopping early.")
+                    break
+                if not line:
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if not entry.get("id") or not entry.get("title"):
+                    continue
+                # The flat listing already carries what details() needs, so seed the cache
+                # and let stream() resolve every entry without another search.
+                await meta_cache.set(self._flat_info(entry))
+                yield {"id": entry["id"], "title": entry["title"], "duration": entry.get("duration")}
@@ -2,7 +2,7 @@ from pyrogram import filters
 from pyrogram.types import Message
 
 from Toxic import YouTube, app
-from Toxic.core.call import Dev
+from Toxic.core.player import players
 from Toxic.misc import db
 from Toxic.utils import AdminRightsCheck, seconds_to_min
 from Toxic.utils.inline import close_markup
@@ -56,7 +56,7 @@ async def seek_comm(cli, message: Message, _, chat_id):
     if "index_" in file_path:
         file_path = playing[0]["vidid"]
     try:
-        await Dev.seek_stream(
+        await players.seek(
             chat_id,
             file_path,
             seconds_to_min(to_seek),
@@ -2,7 +2,7 @@ from pyrogram import filters
 from pyrogram.types import Message
 
 from Toxic import app
-from Toxic.core.call import Dev
+from Toxic.core.player import players
 from Toxic.misc import SUDOERS, db
 from Toxic.utils import AdminRightsCheck
 from Toxic.utils.database import is_active_chat, is_nonadmin_chat
@@ -94,7 +94,7 @@ async def del_back_playlist(client, CallbackQuery, _):
         text=_["admin_32"].format(CallbackQuery.from_user.mention),
     )
     try:
-        await Dev.speedup_stream(
+        await players.speedup(
             chat_id,
             file_path,
             speed,
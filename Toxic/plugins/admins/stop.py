@@ -2,7 +2,7 @@ from pyrogram import filters
 from pyrogram.types import Message
 
 from Toxic import app
-from Toxic.core.call import Dev
+from Toxic.core.player import players
 from Toxic.utils.database import set_loop
 from Toxic.utils.decorators import AdminRightsCheck
 from Toxic.utils.inline import close_markup
@@ -16,7 +16,7 @@ from config import BANNED_USERS
 async def stop_music(cli, message: Message, _, chat_id):
     if not len(message.command) == 1:
         return
-    await Dev.stop_stream(chat_id)
+    await players.stop(chat_id)
     await set_loop(chat_id, 0)
     await message.reply_text(
         _["admin_5"].format(message.from_user.mention), reply_markup=close_markup(_)
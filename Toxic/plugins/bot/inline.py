@@ -7,6 +7,7 @@ from youtubesearchpython.__future__ import VideosSearch
 
 from Toxic import app
 from Toxic.utils.inlinequery import answer
+from Toxic.utils.ratelimit import BACKGROUND, RateLimited, governor
 from config import BANNED_USERS
 
 
@@ -20,6 +21,11 @@ async def inline_query_handler(client, query):
         except:
             return
     else:
+        try:
+            with governor.priority(BACKGROUND):
+                await governor.acquire("search")
+        except RateLimited:
+            return
         a = VideosSearch(text, limit=20)
         result = (await a.next()).get("result")
         for x in range(15):
@@ -22,6 +22,7 @@ from Toxic.utils.database import (
 from Toxic.utils.decorators.language import LanguageStart
 from Toxic.utils.formatters import get_readable_time
 from Toxic.utils.inline import help_pannel, private_panel, start_panel
+from Toxic.utils.ratelimit import PREFETCH, governor
 from config import BANNED_USERS,  START_VIDS, U_M
 from strings import get_string
 
@@ -51,6 +52,8 @@ async def start_pm(client, message: Message, _):
             m = await message.reply_text("🔎")
             query = (str(name)).replace("info_", "", 1)
             query = f"https://www.youtube.com/watch?v={query}"
+            with governor.priority(PREFETCH):
+                await governor.acquire("search")
             results = VideosSearch(query, limit=1)
             for result in (await results.next())["result"]:
                 title = result["title"]
@@ -171,14 +171,11 @@ async def play_commnd(
     elif url:
         if await YouTube.exists(url):
             if "playlist" in url:
-                try:
-                    details = await YouTube.playlist(
-                        url,
-                        config.PLAYLIST_FETCH_LIMIT,
-                        message.from_user.id,
-                    )
-                except:
-                    return await mystic.edit_text(_["play_3"])
+                details = YouTube.playlist(
+                    url,
+                    config.PLAYLIST_FETCH_LIMIT,
+                    message.from_user.id,
+                )
                 streamtype = "playlist"
                 plist_type = "yt"
                 if "&" in url:
@@ -383,7 +380,12 @@ async def play_commnd(
             )
         except Exception as e:
             ex_type = type(e).__name__
-            err = e if ex_type == "AssistantErr" else _["general_2"].format(ex_type)
+            if ex_type == "AssistantErr":
+                err = e
+            elif streamtype == "playlist":
+                err = _["play_3"]
+            else:
+                err = _["general_2"].format(ex_type)
             await safe_edit(mystic._client, mystic.chat.id, mystic.id, err)
         await mystic.delete()
         return await play_logs(message, streamtype=streamtype)
@@ -563,15 +565,12 @@ async def play_playlists_command(client, CallbackQuery, _):
     spotify = True
     if ptype == "yt":
         spotify = False
-        try:
-            result = await YouTube.playlist(
-                videoid,
-                config.PLAYLIST_FETCH_LIMIT,
-                CallbackQuery.from_user.id,
-                True,
-            )
-        except:
-            return await mystic.edit_text(_["play_3"])
+        result = YouTube.playlist(
+            videoid,
+            config.PLAYLIST_FETCH_LIMIT,
+            CallbackQuery.from_user.id,
+            True,
+        )
     if ptype == "spplay":
         try:
             result, spotify_id = await Spotify.playlist(videoid)
@@ -608,7 +607,7 @@ async def play_playlists_command(client, CallbackQuery, _):
         )
     except Exception as e:
         ex_type = type(e).__name__
-        err = e if ex_type == "AssistantErr" else _["general_2"].format(ex_type)
+        err = e if ex_type == "AssistantErr" else _["play_3"]
         return await mystic.edit_text(err)
     return await mystic.delete()
 
@@ -0,0 +1,64 @@
+from urllib.parse import urlsplit
+
+from pyrogram import filters
+from pyrogram.types import Message
+
+from Toxic import YouTube, app
+from Toxic.core.player import players
+from Toxic.misc import SUDOERS
+from Toxic.utils.ratelimit import governor
+from Toxic.utils.scheduler import scheduler
+
+
+def _label(source: str) -> str:
+    if not source.startswith("proxy:"):
+        return source
+    # Never leak proxy credentials into the chat.
+    parts = urlsplit(source[len("proxy:"):])
+    return f"proxy:{parts.hostname}:{parts.port}" if parts.hostname else "proxy"
+
+
+@app.on_message(filters.command(["sources", "scores"]) & SUDOERS)
+async def source_scores(_, message: Message):
+    scores = YouTube.source_scores()
+    if not scores:
+        return await message.reply_text("» ɴᴏ sᴏᴜʀᴄᴇ ʜᴀs ʙᴇᴇɴ ᴜsᴇᴅ ʏᴇᴛ.")
+    text = "<b>sᴏᴜʀᴄᴇ sᴄᴏʀᴇs :</b>\n\n"
+    for source, st in sorted(scores.items(), key=lambda x: -x[1]["score"]):
+        latency = f"{st['latency']:.2f}s" if st["latency"] is not None else "-"
+        text += (
+            f"<b>{_label(source)}</b>\n"
+            f"ᴏᴋ : {st['success']} | ғᴀɪʟ : {st['failure']} | ʀᴀᴛᴇ : {st['rate'] * 100:.0f}%\n"
+            f"ʟᴀᴛᴇɴᴄʏ : {latency}"
+        )
+        if st["ejected"]:
+            text += f" | ᴇᴊᴇᴄᴛᴇᴅ ғᴏʀ {int(st['ejected'])}s"
+        text += "\n\n"
+    await message.reply_text(text)
+
+
+@app.on_message(filters.command(["procs", "load"]) & SUDOERS)
+async def process_load(_, message: Message):
+    text = "<b>ᴘʀᴏᴄᴇssᴇs :</b>\n\n"
+    for kind, st in scheduler.stats().items():
+        text += (
+            f"<b>{kind}</b> : {st['running']}/{st['limit']} ʀᴜɴɴɪɴɢ | {st['queued']} ǫᴜᴇᴜᴇᴅ\n"
+            f"sᴛᴀʀᴛᴇᴅ : {st['started']} | ᴛɪᴍᴇᴅ ᴏᴜᴛ : {st['timed_out']}\n\n"
+        )
+    text += "<b>ʀᴀᴛᴇ ʟɪᴍɪᴛs :</b>\n\n"
+    for kind, st in governor.stats().items():
+        text += f"<b>{kind}</b> : {st['tokens']:.1f} ᴛᴏᴋᴇɴs | {st['waiting']} ᴡᴀɪᴛɪɴɢ | {st['dropped']} ᴅʀᴏᴘᴘᴇᴅ\n"
+    shared = {}
+    for key, waiting in YouTube.inflight_waiters().items():
+        tasks, callers = shared.get(key[0], (0, 0))
+        shared[key[0]] = (tasks + 1, callers + waiting)
+    if shared:
+        text += "\n<b>ɪɴ-ғʟɪɢʜᴛ :</b>\n\n"
+        for kind, (tasks, callers) in shared.items():
+            text += f"<b>{kind}</b> : {tasks} ᴛᴀsᴋs | {callers} ᴄᴀʟʟᴇʀs\n"
+    states = players.states()
+    if states:
+        text += "\n<b>ᴘʟᴀʏᴇʀs :</b>\n\n"
+        text += " | ".join(f"{state} : {count}" for state, count in states.most_common())
+        text += f"\nᴛʀᴀᴄᴋs sᴛᴀʀᴛᴇᴅ : {players.counts['track']} | ғᴀɪʟᴇᴅ : {players.counts['failed']}\n"
+    await message.reply_text(text)
@@ -1,6 +1,5 @@
 import os
 import re
-import subprocess
 import sys
 import traceback
 from inspect import getfullargspec
@@ -11,6 +10,7 @@ from pyrogram import filters
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
 
 from Toxic import app
+from Toxic.utils.scheduler import scheduler
 from config import OWNER_ID
 
 
@@ -160,26 +160,19 @@ async def shellrunner(_, message: Message):
         for x in code:
             shell = re.split(""" (?=(?:[^'"]|'[^']*'|"[^"]*")*$)""", x)
             try:
-                process = subprocess.Popen(
-                    shell,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                )
+                _, stdout, _ = await scheduler.run("shell", *shell)
             except Exception as err:
                 await edit_or_reply(message, text=f"<b>ERROR :</b>\n<pre>{err}</pre>")
+                continue
             output += f"<b>{code}</b>\n"
-            output += process.stdout.read()[:-1].decode("utf-8")
+            output += stdout[:-1].decode("utf-8")
             output += "\n"
     else:
         shell = re.split(""" (?=(?:[^'"]|'[^']*'|"[^"]*")*$)""", text)
         for a in range(len(shell)):
             shell[a] = shell[a].replace('"', "")
         try:
-            process = subprocess.Popen(
-                shell,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
+            _, stdout, _ = await scheduler.run("shell", *shell)
         except Exception as err:
             print(err)
             exc_type, exc_obj, exc_tb = sys.exc_info()
@@ -191,7 +184,7 @@ async def shellrunner(_, message: Message):
             return await edit_or_reply(
                 message, text=f"<b>ERROR :</b>\n<pre>{''.join(errors)}</pre>"
             )
-        output = process.stdout.read()[:-1].decode("utf-8")
+        output = stdout[:-1].decode("utf-8")
     if str(output) == "\n":
         output = None
     if output:
@@ -16,6 +16,7 @@ from Toxic.plugins import ALL_MODULES
 from Toxic.utils.database import get_served_chats, get_served_users, get_sudoers
 from Toxic.utils.decorators.language import language, languageCB
 from Toxic.utils.inline.stats import back_stats_buttons, stats_buttons
+from Toxic.utils.placement import placement
 from config import BANNED_USERS
 
 
@@ -63,6 +64,13 @@ async def overall_stats(client, CallbackQuery, _):
         config.AUTO_LEAVING_ASSISTANT,
         config.DURATION_LIMIT_MIN,
     )
+    text += "\n\n<b>ᴀssɪsᴛᴀɴᴛ ʟᴏᴀᴅ :</b>"
+    for load in placement.stats(assistants):
+        text += f"\n<b>{load['assistant']} :</b> <code>{load['active']}</code> ᴀᴄᴛɪᴠᴇ ᴄᴀʟʟs"
+        if load["flood"]:
+            text += f" | ғʟᴏᴏᴅᴡᴀɪᴛ <code>{load['flood']}s</code>"
+        if load["flooded"]:
+            text += " (ᴡᴀɪᴛɪɴɢ)"
     med = InputMediaPhoto(media=config.STATS_IMG_URL, caption=text)
     try:
         await CallbackQuery.edit_message_media(media=med, reply_markup=upl)
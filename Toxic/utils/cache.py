@@ -0,0 +1,161 @@
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from Toxic.core.mongo import mongodb
+from Toxic.logging import LOGGER
+from config import (
+    META_CACHE_MONGO,
+    META_CACHE_SIZE,
+    META_CACHE_TTL,
+    NEGATIVE_CACHE_PERMANENT_TTL,
+    NEGATIVE_CACHE_TTL,
+)
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires, value = item
+        if expires <= time.time():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.time() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def expires(self, key: Hashable) -> Optional[float]:
+        item = self._data.get(key)
+        return item[0] if item else None
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class MetaCache:
+    """Video metadata keyed by video id, with search queries mapped onto ids."""
+
+    def __init__(self, maxsize: int, ttl: float, persist: bool = False):
+        self.ttl = ttl
+        self._videos = TTLCache(maxsize, ttl)
+        self._queries = TTLCache(maxsize, ttl)
+        self._db = mongodb.ytmeta if persist else None
+
+    async def get(self, key: str) -> Optional[dict]:
+        vidid = self._queries.get(key)
+        if vidid is None and self._db is not None:
+            doc = await self._find(f"q:{key}")
+            if doc:
+                vidid = doc["vidid"]
+                self._queries.set(key, vidid, doc["expires"] - time.time())
+        vidid = vidid or key
+        info = self._videos.get(vidid)
+        if info is None and self._db is not None:
+            doc = await self._find(vidid)
+            if doc:
+                info = doc["info"]
+                self._videos.set(vidid, info, doc["expires"] - time.time())
+        return dict(info) if info else None
+
+    async def set(self, info: dict, query: Optional[str] = None) -> None:
+        vidid = info["id"]
+        self._videos.set(vidid, dict(info))
+        if query and query != vidid:
+            self._queries.set(query, vidid)
+        if self._db is None:
+            return
+        expires = time.time() + self.ttl
+        await self._save(vidid, {"info": info, "expires": expires})
+        if query and query != vidid:
+            await self._save(f"q:{query}", {"vidid": vidid, "expires": expires})
+
+    async def _find(self, key: str) -> Optional[dict]:
+        try:
+            doc = await self._db.find_one({"_id": key})
+        except Exception as e:
+            LOGGER(__name__).warning("Metadata cache lookup failed: %s", repr(e))
+            return None
+        if not doc or doc.get("expires", 0) <= time.time():
+            return None
+        return doc
+
+    async def _save(self, key: str, doc: dict) -> None:
+        try:
+            await self._db.update_one({"_id": key}, {"$set": doc}, upsert=True)
+        except Exception as e:
+            LOGGER(__name__).warning("Metadata cache write failed: %s", repr(e))
+
+
+class NegativeCache:
+    """Video ids that recently failed, remembered with the class of failure.
+
+    Permanent classes (private, removed, age or geo restricted) are kept for
+    ``permanent_ttl`` seconds, anything else for ``transient_ttl``.
+    """
+
+    PATTERNS = [
+        ("private", re.compile(r"private video", re.I)),
+        ("age", re.compile(r"confirm your age|age[- ]restrict|inappropriate for some users", re.I)),
+        ("geo", re.compile(r"not (?:made )?available in your country|blocked it in your country|geo[- ]?restrict", re.I)),
+        ("removed", re.compile(r"video unavailable|been removed|no longer available|account .*terminated|does not exist", re.I)),
+    ]
+    TRANSIENT = "transient"
+
+    def __init__(self, maxsize: int, transient_ttl: float, permanent_ttl: float):
+        self.transient_ttl = transient_ttl
+        self.permanent_ttl = permanent_ttl
+        self._data = TTLCache(maxsize, transient_ttl)
+
+    @classmethod
+    def classify(cls, error: Optional[str]) -> str:
+        for kind, pattern in cls.PATTERNS:
+            if error and pattern.search(error):
+                return kind
+        return cls.TRANSIENT
+
+    def mark(self, vidid: str, error: Optional[str] = None) -> str:
+        kind = self.classify(error)
+        current = self._data.get(vidid)
+        if kind == self.TRANSIENT and current not in (None, self.TRANSIENT):
+            return current
+        ttl = self.transient_ttl if kind == self.TRANSIENT else self.permanent_ttl
+        if ttl > 0:
+            self._data.set(vidid, kind, ttl)
+        return kind
+
+    def get(self, vidid: str) -> Optional[str]:
+        return self._data.get(vidid)
+
+    def permanent(self, vidid: str) -> Optional[str]:
+        """The failure class of ``vidid`` unless it is only transient."""
+        kind = self._data.get(vidid)
+        return None if kind == self.TRANSIENT else kind
+
+    def clear(self, vidid: str) -> None:
+        self._data.pop(vidid)
+
+
+meta_cache = MetaCache(META_CACHE_SIZE, META_CACHE_TTL, META_CACHE_MONGO)
+bad_videos = NegativeCache(META_CACHE_SIZE, NEGATIVE_CACHE_TTL, NEGATIVE_CACHE_PERMANENT_TTL)
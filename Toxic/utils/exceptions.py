@@ -1,3 +1,8 @@
 class AssistantErr(Exception):
     def __init__(self, errr: str):
         super().__init__(errr)
+
+
+class DownloadErr(Exception):
+    def __init__(self, errr: str):
+        super().__init__(errr)
@@ -1,5 +1,6 @@
 import json
-import subprocess
+
+from Toxic.utils.scheduler import scheduler
 
 
 def get_readable_time(seconds: int) -> str:
@@ -116,7 +117,7 @@ def speed_converter(seconds, speed):
     return "-"
 
 
-def check_duration(file_path):
+async def check_duration(file_path):
     command = [
         "ffprobe",
         "-loglevel",
@@ -128,8 +129,7 @@ def check_duration(file_path):
         file_path,
     ]
 
-    pipe = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-    out, err = pipe.communicate()
+    _, out, _ = await scheduler.run("ffprobe", *command)
     _json = json.loads(out)
 
     if "format" in _json:
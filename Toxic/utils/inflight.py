@@ -0,0 +1,55 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from Toxic.utils.ratelimit import Priority, governor
+
+
+class InFlight:
+    """Collapses concurrent calls for the same key onto one shared task.
+
+    The shared task runs at the most urgent priority among its callers.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self._priorities: Dict[Hashable, Priority] = {}
+        self.started = 0
+        self.joined = 0
+
+    def _done(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+            self._waiters.pop(key, None)
+            self._priorities.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+    async def run(
+        self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs
+    ) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            # Its own priority, so promoting it leaves the first caller's context alone.
+            with governor.priority(governor.current()) as priority:
+                task = asyncio.ensure_future(func(*args, **kwargs))
+            self._tasks[key] = task
+            self._priorities[key] = priority
+            self._waiters[key] = 0
+            task.add_done_callback(lambda t: self._done(key, t))
+            self.started += 1
+        else:
+            self.joined += 1
+            governor.promote(self._priorities[key], governor.current())
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if key in self._waiters and self._tasks.get(key) is task:
+                self._waiters[key] -= 1
+                # Nobody is left waiting on an unfinished task: the callers gave up.
+                if self._waiters[key] == 0 and not task.done():
+                    task.cancel()
+
+    def waiters(self) -> Dict[Hashable, int]:
+        return dict(self._waiters)
@@ -0,0 +1,147 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from pyrogram.enums import ChatMemberStatus
+
+from Toxic import app
+from Toxic.core.mongo import mongodb
+from Toxic.logging import LOGGER
+from Toxic.utils.database import active, assdb, assistantdict, get_client
+
+pooldb = mongodb.assistantpool
+
+
+class Placement:
+    """Chooses the assistant a new chat is pinned to.
+
+    Candidates are ranked by the calls they are carrying right now, the
+    FloodWait seconds they collected in the last ``FLOOD_WINDOW`` and whether
+    they would first have to join the chat. An assistant still inside a
+    FloodWait is only used when every other one is too.
+    """
+
+    FLOOD_WINDOW = 3600
+    # One active call weighs as much as this many seconds of recent FloodWait.
+    FLOOD_WEIGHT = 60
+    JOIN_COST = 1
+
+    def __init__(self):
+        self._floods: Dict[int, deque] = {}
+        self._flooded_until: Dict[int, float] = {}
+
+    def flood(self, assistant: int, seconds: int) -> None:
+        now = time.time()
+        self._floods.setdefault(int(assistant), deque()).append((now, seconds))
+        self._flooded_until[int(assistant)] = max(
+            self._flooded_until.get(int(assistant), 0), now + seconds
+        )
+
+    def flood_chat(self, chat_id: int, seconds: int) -> None:
+        """Records a FloodWait hit by whichever assistant serves ``chat_id``."""
+        assistant = assistantdict.get(chat_id)
+        if assistant:
+            self.flood(assistant, seconds)
+
+    def load(self, assistant: int) -> int:
+        return sum(1 for chat_id in active if assistantdict.get(chat_id) == assistant)
+
+    def flood_seconds(self, assistant: int) -> int:
+        history = self._floods.get(assistant)
+        if not history:
+            return 0
+        cutoff = time.time() - self.FLOOD_WINDOW
+        while history and history[0][0] < cutoff:
+            history.popleft()
+        return sum(seconds for _, seconds in history)
+
+    def flooded(self, assistant: int) -> bool:
+        return self._flooded_until.get(assistant, 0) > time.time()
+
+    @staticmethod
+    async def _membership(chat_id: int, assistant: int) -> Optional[bool]:
+        """True if a member, False if not, None if banned or restricted."""
+        client = await get_client(assistant)
+        try:
+            member = await asyncio.wait_for(app.get_chat_member(chat_id, client.id), 10)
+        except Exception:
+            return False
+        if member.status in (ChatMemberStatus.BANNED, ChatMemberStatus.RESTRICTED):
+            return None
+        return member.status != ChatMemberStatus.LEFT
+
+    def _cost(self, assistant: int, member: Optional[bool]) -> float:
+        cost = self.load(assistant) + self.flood_seconds(assistant) / self.FLOOD_WEIGHT
+        if not member:
+            cost += self.JOIN_COST
+        return cost
+
+    async def choose(self, chat_id: int, assistants: List[int]) -> int:
+        if len(assistants) == 1:
+            return assistants[0]
+        members = await asyncio.gather(
+            *(self._membership(chat_id, assistant) for assistant in assistants)
+        )
+        candidates = [
+            (self.flooded(a), member is None, self._cost(a, member), random.random(), a)
+            for a, member in zip(assistants, members)
+        ]
+        return min(candidates)[-1]
+
+    def stats(self, assistants: List[int]) -> List[dict]:
+        return [
+            {
+                "assistant": assistant,
+                "active": self.load(assistant),
+                "flood": self.flood_seconds(assistant),
+                "flooded": self.flooded(assistant),
+            }
+            for assistant in assistants
+        ]
+
+    async def rebalance(self, assistants: List[int]) -> None:
+        """Spreads idle chats evenly again after assistants were added or removed."""
+        if not assistants:
+            return
+        previous = await pooldb.find_one({"_id": "pool"})
+        if previous and sorted(previous["assistants"]) == sorted(assistants):
+            return
+        pinned: Dict[int, List[int]] = {assistant: [] for assistant in assistants}
+        orphans = []
+        async for doc in assdb.find({}):
+            chat_id = doc["chat_id"]
+            if chat_id in active:
+                continue
+            if doc.get("assistant") in pinned:
+                pinned[doc["assistant"]].append(chat_id)
+            else:
+                orphans.append((chat_id, None))
+        total = sum(len(chats) for chats in pinned.values()) + len(orphans)
+        target = -(-total // len(assistants))
+        for assistant in assistants:
+            orphans.extend((chat_id, assistant) for chat_id in pinned[assistant][target:])
+            del pinned[assistant][target:]
+        moved = 0
+        for chat_id, current in orphans:
+            assistant = min(assistants, key=lambda a: len(pinned[a]))
+            pinned[assistant].append(chat_id)
+            if assistant == current:
+                continue
+            assistantdict.pop(chat_id, None)
+            await assdb.update_one(
+                {"chat_id": chat_id},
+                {"$set": {"assistant": assistant}},
+                upsert=True,
+            )
+            moved += 1
+        await pooldb.update_one(
+            {"_id": "pool"}, {"$set": {"assistants": list(assistants)}}, upsert=True
+        )
+        LOGGER(__name__).info(
+            f"Assistant pool changed, moved {moved} idle chats across {len(assistants)} assistants."
+        )
+
+
+placement = Placement()
@@ -0,0 +1,175 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from config import (
+    RATE_BACKGROUND_WAIT,
+    SEARCH_RATE,
+    SEARCH_BURST,
+    YTDL_RATE,
+    YTDL_BURST,
+)
+
+# Priority classes, served lowest first.
+NOW_PLAYING = 0
+PREFETCH = 1
+BACKGROUND = 2
+
+
+
+class Priority:
+    """Priority class of a task, mutable so shared work can be promoted."""
+
+    __slots__ = ("level",)
+
+    def __init__(self, level: int):
+        self.level = level
+
+
+_priority: ContextVar[Optional[Priority]] = ContextVar("priority", default=None)
+
+
+class RateLimited(Exception):
+    pass
+
+
+class TokenBucket:
+    """Token bucket whose waiters are served by priority, then arrival."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.dropped = 0
+        self._updated = time.monotonic()
+        self._waiters: list = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        self._refill()
+        while self._waiters and self.tokens >= 1:
+            _, _, future, _ = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.tokens -= 1
+            future.set_result(True)
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if self._waiters:
+            delay = (1 - self.tokens) / self.rate
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    async def acquire(self, priority: Priority, max_wait: Callable[[], Optional[float]] = lambda: None) -> bool:
+        """Waits for a token; ``max_wait`` is asked again if ``priority`` changed meanwhile."""
+        if self.rate <= 0:
+            return True
+        self._refill()
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._waiters, [priority.level, next(self._seq), future, priority])
+        if self._timer is None:
+            self._dispatch()
+        start = loop.time()
+        try:
+            while True:
+                limit = max_wait()
+                timeout = None if limit is None else max(limit - (loop.time() - start), 0)
+                try:
+                    return await asyncio.wait_for(asyncio.shield(future), timeout)
+                except asyncio.TimeoutError:
+                    if max_wait() == limit:
+                        self.dropped += 1
+                        return False
+        finally:
+            future.cancel()
+
+    def reorder(self, priority: Priority) -> None:
+        """Moves the waiters of ``priority`` to its current level."""
+        moved = False
+        for entry in self._waiters:
+            if entry[3] is priority and entry[0] != priority.level:
+                entry[0], moved = priority.level, True
+        if moved:
+            heapq.heapify(self._waiters)
+
+    def waiting(self) -> int:
+        return sum(1 for *_, future, _ in self._waiters if not future.done())
+
+
+class Governor:
+    """Shared outbound budget for youtube search and yt-dlp.
+
+    The priority of a request comes from the calling context (see
+    :meth:`priority`), so it follows a task into everything it awaits. Work
+    shared between callers runs under its own :class:`Priority`, which
+    :meth:`promote` raises when a more urgent caller joins.
+    Now-playing and prefetch requests wait for a token; background ones
+    (thumbnails, inline search) give up after RATE_BACKGROUND_WAIT seconds
+    and raise :class:`RateLimited`.
+    """
+
+    def __init__(self, buckets: Dict[str, TokenBucket], background_wait: float):
+        self.buckets = buckets
+        self.max_wait = {NOW_PLAYING: None, PREFETCH: None, BACKGROUND: background_wait}
+
+    @staticmethod
+    @contextmanager
+    def priority(level: int):
+        """Runs the block, and everything it starts, under a fresh ``level`` priority."""
+        token = _priority.set(Priority(level))
+        try:
+            yield _priority.get()
+        finally:
+            _priority.reset(token)
+
+    @staticmethod
+    def current() -> int:
+        priority = _priority.get()
+        return NOW_PLAYING if priority is None else priority.level
+
+    def promote(self, priority: Priority, level: int) -> None:
+        """Raises ``priority`` to ``level`` if that is more urgent, requeueing its waiters."""
+        if level >= priority.level:
+            return
+        priority.level = level
+        for bucket in self.buckets.values():
+            bucket.reorder(priority)
+
+    async def acquire(self, kind: str) -> None:
+        priority = _priority.get() or Priority(NOW_PLAYING)
+        if not await self.buckets[kind].acquire(priority, lambda: self.max_wait[priority.level]):
+            raise RateLimited(f"{kind} budget exhausted")
+
+    def stats(self) -> Dict[str, dict]:
+        stats = {}
+        for kind, bucket in self.buckets.items():
+            bucket._refill()
+            stats[kind] = {
+                "tokens": bucket.tokens,
+                "waiting": bucket.waiting(),
+                "dropped": bucket.dropped,
+            }
+        return stats
+
+
+governor = Governor(
+    {
+        "search": TokenBucket(SEARCH_RATE, SEARCH_BURST),
+        "ytdlp": TokenBucket(YTDL_RATE, YTDL_BURST),
+    },
+    RATE_BACKGROUND_WAIT,
+)
@@ -0,0 +1,127 @@
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+
+from Toxic.logging import LOGGER
+from Toxic.utils.ratelimit import governor
+from config import PROC_LIMITS, PROC_TIMEOUTS
+
+
+class PrioritySemaphore:
+    """Semaphore handing free slots to the waiter with the lowest priority value."""
+
+    def __init__(self, value: int):
+        self.value = value
+        self.running = 0
+        self._waiters: list = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: int) -> None:
+        if self.running < self.value and not self.queued():
+            self.running += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted a slot right before being cancelled: hand it on.
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.running -= 1
+        while self._waiters and self.running < self.value:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.running += 1
+            future.set_result(None)
+
+    def queued(self) -> int:
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+
+class ProcessScheduler:
+    """Every child process the bot starts goes through here.
+
+    Each kind (yt-dlp, ffmpeg, ffprobe, ...) has its own concurrency limit
+    from PROC_LIMITS and default timeout from PROC_TIMEOUTS. Queued launches
+    are served by the caller's priority class (see Toxic.utils.ratelimit), so
+    interactive work overtakes background jobs. A process is killed when it
+    times out or its caller is cancelled.
+    """
+
+    def __init__(self, limits: Dict[str, int], timeouts: Dict[str, Optional[float]]):
+        self.timeouts = timeouts
+        self._slots = {kind: PrioritySemaphore(limit) for kind, limit in limits.items()}
+        self._started: Dict[str, int] = {kind: 0 for kind in limits}
+        self._timed_out: Dict[str, int] = {kind: 0 for kind in limits}
+
+    @asynccontextmanager
+    async def spawn(self, kind: str, *args: str, priority: Optional[int] = None, **kwargs):
+        """Starts ``args`` once a ``kind`` slot is free and yields the process.
+
+        The process is killed if it is still running when the block exits.
+        """
+        slots = self._slots[kind]
+        await slots.acquire(governor.current() if priority is None else priority)
+        try:
+            kwargs.setdefault("stdout", asyncio.subprocess.PIPE)
+            kwargs.setdefault("stderr", asyncio.subprocess.PIPE)
+            proc = await asyncio.create_subprocess_exec(*args, **kwargs)
+            self._started[kind] += 1
+            try:
+                yield proc
+            finally:
+                if proc.returncode is None:
+                    try:
+                        proc.kill()
+                    except ProcessLookupError:
+                        pass
+                    await proc.wait()
+        finally:
+            slots.release()
+
+    async def run(
+        self,
+        kind: str,
+        *args: str,
+        input: Optional[bytes] = None,
+        timeout: Optional[float] = None,
+        priority: Optional[int] = None,
+        **kwargs,
+    ) -> Tuple[int, bytes, bytes]:
+        """Runs ``args`` to completion and returns ``(returncode, stdout, stderr)``.
+
+        Raises asyncio.TimeoutError after ``timeout`` (or the kind's default) seconds.
+        """
+        timeout = self.timeouts.get(kind) if timeout is None else timeout
+        if input is not None:
+            kwargs.setdefault("stdin", asyncio.subprocess.PIPE)
+        async with self.spawn(kind, *args, priority=priority, **kwargs) as proc:
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(input), timeout)
+            except asyncio.TimeoutError:
+                self._timed_out[kind] += 1
+                LOGGER(__name__).warning(f"{kind} process {args[0]} timed out after {timeout}s, killed.")
+                raise
+        return proc.returncode, stdout or b"", stderr or b""
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            kind: {
+                "running": slots.running,
+                "queued": slots.queued(),
+                "limit": slots.value,
+                "started": self._started[kind],
+                "timed_out": self._timed_out[kind],
+            }
+            for kind, slots in self._slots.items()
+        }
+
+
+scheduler = ProcessScheduler(PROC_LIMITS, PROC_TIMEOUTS)
@@ -0,0 +1,170 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+async def hedged(
+    attempts: List[Callable[[], Awaitable[Any]]],
+    delay: float,
+    ok: Callable[[Any], bool] = bool,
+) -> Optional[Any]:
+    """Runs ``attempts`` as a hedged race and returns the first result passing ``ok``.
+
+    The first attempt starts immediately. The next one starts whenever ``delay``
+    seconds pass without a success, or right away when a running attempt fails.
+    Every attempt still running once a winner is found is cancelled. If none
+    succeeds, the last result (or exception) is returned (or raised).
+    """
+    remaining = list(attempts)
+    pending = set()
+    last_result, last_error = None, None
+    try:
+        while remaining or pending:
+            if remaining and not pending:
+                pending.add(asyncio.ensure_future(remaining.pop(0)()))
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=delay if remaining else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            failed = False
+            for task in done:
+                try:
+                    result = task.result()
+                except Exception as e:
+                    last_error, failed = e, True
+                    continue
+                if ok(result):
+                    return result
+                last_result, failed = result, True
+            if remaining and (failed or not done):
+                pending.add(asyncio.ensure_future(remaining.pop(0)()))
+    finally:
+        for task in pending:
+            task.cancel()
+    if last_result is None and last_error is not None:
+        raise last_error
+    return last_result
+
+
+class SourceStats:
+    def __init__(self):
+        self.success = 0
+        self.failure = 0
+        self.latency: Optional[float] = None
+        self.streak = 0
+        self.trips = 0
+        self.ejected_until = 0.0
+
+    @property
+    def rate(self) -> float:
+        return (self.success + 1) / (self.success + self.failure + 2)
+
+
+class Scoreboard:
+    """Tracks outcome and latency per source to steer selection away from bad ones.
+
+    Each source keeps a smoothed success rate and a latency EWMA. After
+    ``eject_after`` consecutive failures it is ejected for ``eject_for``
+    seconds, doubling on every further trip up to ``max_eject``.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.3,
+        eject_after: int = 3,
+        eject_for: float = 60,
+        max_eject: float = 900,
+        default_latency: float = 2.0,
+    ):
+        self.alpha = alpha
+        self.eject_after = eject_after
+        self.eject_for = eject_for
+        self.max_eject = max_eject
+        self.default_latency = default_latency
+        self._stats: Dict[str, SourceStats] = {}
+
+    def stats(self, source: str) -> SourceStats:
+        if source not in self._stats:
+            self._stats[source] = SourceStats()
+        return self._stats[source]
+
+    def record(self, source: str, ok: bool, latency: float) -> None:
+        st = self.stats(source)
+        if ok:
+            st.success += 1
+            st.streak = 0
+            st.trips = 0
+            st.latency = latency if st.latency is None else (
+                self.alpha * latency + (1 - self.alpha) * st.latency
+            )
+            return
+        st.failure += 1
+        st.streak += 1
+        if st.streak >= self.eject_after:
+            st.trips += 1
+            st.streak = 0
+            st.ejected_until = time.time() + min(
+                self.eject_for * 2 ** (st.trips - 1), self.max_eject
+            )
+
+    def score(self, source: str) -> float:
+        st = self.stats(source)
+        return st.rate / (st.latency or self.default_latency)
+
+    def available(self, sources: List[str]) -> List[str]:
+        now = time.time()
+        alive = [s for s in sources if self.stats(s).ejected_until <= now]
+        if alive or not sources:
+            return alive
+        # Everything is ejected: fall back to the one coming back soonest.
+        return [min(sources, key=lambda s: self.stats(s).ejected_until)]
+
+    def pick(self, sources: List[str]) -> Optional[str]:
+        """Weighted random choice among live sources, favouring high scores."""
+        alive = self.available(sources)
+        if not alive:
+            return None
+        return random.choices(alive, weights=[self.score(s) for s in alive])[0]
+
+    def rank(self, sources: List[str]) -> List[str]:
+        """Live sources best first; ejected ones sit out their cool-down."""
+        return sorted(self.available(sources), key=lambda s: -self.score(s))
+
+    async def timed(
+        self,
+        source: str,
+        func: Callable[[], Awaitable[Any]],
+        ok: Callable[[Any], bool] = bool,
+        excused: Callable[[Exception], bool] = lambda e: False,
+    ) -> Any:
+        """Awaits ``func()`` and records its outcome; cancellation is not counted.
+
+        Exceptions count as failures unless ``excused`` says they are not the
+        source's fault.
+        """
+        start = time.monotonic()
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.record(source, excused(e), time.monotonic() - start)
+            raise
+        self.record(source, ok(result), time.monotonic() - start)
+        return result
+
+    def snapshot(self) -> Dict[str, dict]:
+        now = time.time()
+        return {
+            source: {
+                "success": st.success,
+                "failure": st.failure,
+                "rate": st.rate,
+                "latency": st.latency,
+                "score": self.score(source),
+                "ejected": max(st.ejected_until - now, 0),
+            }
+            for source, st in self._stats.items()
+        }
@@ -1,5 +1,6 @@
 import os
 
+from Toxic import YouTube
 from config import autoclean
 
 
@@ -8,7 +9,7 @@ async def auto_clean(popped):
         rem = popped["file"]
         autoclean.remove(rem)
         count = autoclean.count(rem)
-        if count == 0:
+        if count == 0 and not YouTube.is_cached_track(rem):
             if "vid_" not in rem or "live_" not in rem or "index_" not in rem:
                 try:
                     os.remove(rem)
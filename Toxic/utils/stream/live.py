@@ -0,0 +1,166 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+
+from Toxic import YouTube
+from Toxic.logging import LOGGER
+from Toxic.misc import db
+from Toxic.utils.database import group_assistant, is_music_playing
+from config import LIVE_MAX_RESTARTS, LIVE_REFRESH_AHEAD, LIVE_STALL_TIMEOUT
+
+
+class LiveSession:
+    def __init__(self, chat_id: int, vidid: str, video: bool, url: str):
+        self.chat_id = chat_id
+        self.vidid = vidid
+        self.video = video
+        self.url = url
+        self.expires = YouTube.url_expires(url)
+        self.played: Optional[int] = None
+        self.progressed = time.monotonic()
+        self.task: Optional[asyncio.Task] = None
+
+
+class LiveSupervisor:
+    """Keeps live youtube streams playing across url expiry and stalled input.
+
+    Every chat playing a ``live_`` entry gets a watcher that swaps in a freshly
+    resolved url ``refresh_ahead`` seconds before the current one expires, and
+    restarts the stream when its played time stops advancing for
+    ``stall_timeout`` seconds or the call reports it ended. Restarts are
+    capped at ``max_restarts`` an hour per chat. Swaps go through the chat's
+    player, so they never race a skip or a seek.
+    """
+
+    CHECK_INTERVAL = 5
+
+    def __init__(self, refresh_ahead: int, stall_timeout: int, max_restarts: int):
+        self.refresh_ahead = refresh_ahead
+        self.stall_timeout = stall_timeout
+        self.max_restarts = max_restarts
+        self._sessions: Dict[int, LiveSession] = {}
+        self._restarts: Dict[int, deque] = {}
+
+    def watch(self, chat_id: int, vidid: str, video: bool, url: str) -> None:
+        self.stop(chat_id)
+        session = self._sessions[chat_id] = LiveSession(chat_id, vidid, bool(video), url)
+        session.task = asyncio.create_task(self._supervise(session))
+
+    def stop(self, chat_id: int) -> None:
+        self._restarts.pop(chat_id, None)
+        session = self._sessions.pop(chat_id, None)
+        if session and session.task and session.task is not asyncio.current_task():
+            session.task.cancel()
+
+    async def recover(self, chat_id: int, restream: Callable[..., Awaitable[bool]]) -> bool:
+        """Restarts the live entry of ``chat_id`` after its stream ended on its own.
+
+        Called by the player with its lock held, so it hands in a ``restream``
+        that doesn't take the lock again.
+        """
+        session = self._sessions.get(chat_id)
+        if not session or not self._current(session) or not self._allow_restart(chat_id):
+            return False
+        return await self._swap(session, "stream ended", restream)
+
+    @staticmethod
+    def _current(session: LiveSession) -> bool:
+        check = db.get(session.chat_id)
+        return bool(check) and check[0]["file"] == f"live_{session.vidid}"
+
+    def _allow_restart(self, chat_id: int) -> bool:
+        now = time.monotonic()
+        history = self._restarts.setdefault(chat_id, deque())
+        while history and history[0] <= now - 3600:
+            history.popleft()
+        if len(history) >= self.max_restarts:
+            return False
+        history.append(now)
+        return True
+
+    async def _supervise(self, session: LiveSession) -> None:
+        from Toxic.core.player import players
+
+        try:
+            while True:
+                await asyncio.sleep(self.CHECK_INTERVAL)
+                if not self._current(session):
+                    break
+                reason = await self._check(session)
+                if reason == "input stalled" and not self._allow_restart(session.chat_id):
+                    LOGGER(__name__).warning(
+                        f"Live stream in {session.chat_id} keeps stalling, giving up on restarts."
+                    )
+                    break
+                if reason:
+                    # The player lock is the only lock taken; a swap made by
+                    # recover() meanwhile bumps the generation and wins.
+                    generation = players.get(session.chat_id).generation
+
+                    async def restream(*args) -> bool:
+                        return await players.restream(session.chat_id, *args, generation=generation)
+
+                    await self._swap(session, reason, restream)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            LOGGER(__name__).warning(f"Live supervisor for {session.chat_id} failed: {e!r}")
+        finally:
+            if self._sessions.get(session.chat_id) is session:
+                del self._sessions[session.chat_id]
+
+    async def _check(self, session: LiveSession) -> Optional[str]:
+        if session.expires and session.expires - time.time() <= self.refresh_ahead:
+            return "url expiring"
+        now = time.monotonic()
+        if not self.stall_timeout or not await is_music_playing(session.chat_id):
+            session.played, session.progressed = None, now
+            return None
+        played = await self._played_time(session.chat_id)
+        if played is None:
+            return None
+        if played != session.played:
+            session.played, session.progressed = played, now
+            return None
+        if now - session.progressed >= self.stall_timeout:
+            return "input stalled"
+        return None
+
+    @staticmethod
+    async def _played_time(chat_id: int) -> Optional[int]:
+        from Toxic.core.call import Dev
+
+        try:
+            assistant = await group_assistant(Dev, chat_id)
+            return await assistant.played_time(chat_id)
+        except Exception:
+            return None
+
+    async def _swap(self, session: LiveSession, reason: str, restream: Callable[..., Awaitable[bool]]) -> bool:
+        n, url = await YouTube.video(session.vidid, True, fresh=True)
+        if n == 0:
+            LOGGER(__name__).warning(
+                f"Could not re-resolve live stream {session.vidid} ({reason}): {url}"
+            )
+            return False
+        if self._sessions.get(session.chat_id) is not session or not self._current(session):
+            return False
+        try:
+            if not await restream(url, session.video or None, f"live_{session.vidid}"):
+                return False
+        except Exception as e:
+            LOGGER(__name__).warning(
+                f"Could not swap live stream in {session.chat_id} ({reason}): {e!r}"
+            )
+            return False
+        session.url, session.expires = url, YouTube.url_expires(url)
+        if session.expires and session.expires - time.time() <= self.refresh_ahead:
+            # The fresh url expires inside the window as well; stop chasing it.
+            session.expires = None
+        session.played, session.progressed = None, time.monotonic()
+        LOGGER(__name__).info(f"Swapped live stream in {session.chat_id}: {reason}.")
+        return True
+
+
+live = LiveSupervisor(LIVE_REFRESH_AHEAD, LIVE_STALL_TIMEOUT, LIVE_MAX_RESTARTS)
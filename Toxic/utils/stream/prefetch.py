@@ -0,0 +1,78 @@
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple
+
+from Toxic import YouTube
+from Toxic.logging import LOGGER
+from Toxic.misc import db
+from Toxic.utils.ratelimit import PREFETCH, governor
+from config import PREFETCH_LIMIT
+
+
+class Prefetcher:
+    """Downloads the next queued youtube track of each chat in the background."""
+
+    def __init__(self, limit: int):
+        self._budget = asyncio.Semaphore(limit)
+        self._tasks: Dict[int, Tuple[tuple, asyncio.Task]] = {}
+        self._listeners: List[Callable[[int], None]] = []
+
+    def on_change(self, func: Callable[[int], None]) -> None:
+        """Calls ``func(chat_id)`` whenever the next track of a chat may have changed."""
+        self._listeners.append(func)
+
+    @staticmethod
+    def _key(chat_id: int, index: int) -> Optional[tuple]:
+        check = db.get(chat_id)
+        if not check or len(check) <= index:
+            return None
+        entry = check[index]
+        if "vid_" not in str(entry.get("file")):
+            return None
+        return entry["vidid"], str(entry["streamtype"]) == "video"
+
+    def refresh(self, chat_id: int) -> None:
+        """Prefetch db[chat_id][1], cancelling work for a track that is no longer next."""
+        key = self._key(chat_id, 1)
+        running = self._tasks.get(chat_id)
+        if not (running and running[0] == key and not running[1].done()):
+            if running and running[0] == self._key(chat_id, 0):
+                # The prefetched track is the one starting now and its download
+                # is shared with the player; let it finish instead of cancelling.
+                del self._tasks[chat_id]
+            else:
+                self.cancel(chat_id)
+            if key is not None:
+                self._tasks[chat_id] = (key, asyncio.create_task(self._fetch(chat_id, key)))
+        for func in self._listeners:
+            func(chat_id)
+
+    async def wait(self, chat_id: int) -> None:
+        """Waits for the running prefetch of ``chat_id``, without cancelling it if cancelled."""
+        running = self._tasks.get(chat_id)
+        if running and not running[1].done():
+            await asyncio.wait({running[1]})
+
+    def cancel(self, chat_id: int) -> None:
+        running = self._tasks.pop(chat_id, None)
+        if running and not running[1].done():
+            running[1].cancel()
+
+    async def _fetch(self, chat_id: int, key: tuple) -> None:
+        vidid, video = key
+        try:
+            if YouTube.cached_track(vidid, video):
+                return
+            async with self._budget:
+                with governor.priority(PREFETCH):
+                    await YouTube.download(vidid, None, videoid=True, video=video)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            LOGGER(__name__).warning(f"Prefetch of {vidid} for {chat_id} failed: {e!r}")
+        finally:
+            running = self._tasks.get(chat_id)
+            if running and running[1] is asyncio.current_task():
+                del self._tasks[chat_id]
+
+
+prefetcher = Prefetcher(PREFETCH_LIMIT)
@@ -0,0 +1,139 @@
+import asyncio
+import secrets
+import time
+from pathlib import Path
+from typing import Optional
+
+from Toxic.logging import LOGGER
+from Toxic.utils.cache import TTLCache
+from config import PROGRESSIVE_STALL_TIMEOUT
+
+READ_SIZE = 64 * 1024
+# Enough for ffprobe to find the container header when the bitrate is unknown.
+MIN_PREFIX = 256 * 1024
+UNKNOWN_PREFIX = 1024 * 1024
+
+
+class GrowingFile:
+    """A download still in progress: where it lives now and how far it got.
+
+    The path changes as the downloader renames the file, but it stays the
+    same inode, so an already open reader keeps seeing every byte.
+    """
+
+    def __init__(self):
+        self.path: Optional[Path] = None
+        self.written = 0
+        self.total: Optional[int] = None
+        self.duration: Optional[float] = None
+        self.done = False
+        self.failed = False
+        self._loop = asyncio.get_running_loop()
+
+    def update(self, path=None, written=None, total=None, duration=None) -> None:
+        if path:
+            self.path = Path(path)
+        if written:
+            self.written = max(self.written, written)
+        if total:
+            self.total = total
+        if duration:
+            self.duration = duration
+
+    def update_threadsafe(self, *args) -> None:
+        self._loop.call_soon_threadsafe(self.update, *args)
+
+    def finish(self, path: Path) -> None:
+        self.update(path, path.stat().st_size)
+        self.total = self.written
+        self.done = True
+
+    def fail(self) -> None:
+        self.failed = self.done = True
+
+    def prefix_bytes(self, seconds: float) -> int:
+        if self.total and self.duration:
+            return max(MIN_PREFIX, int(self.total * seconds / self.duration))
+        return UNKNOWN_PREFIX
+
+
+class ProgressiveServer:
+    """Serves growing downloads to ffmpeg over loopback HTTP.
+
+    A reader gets whatever is on disk and then waits at the write frontier.
+    ffmpeg consumes at playback speed, so as long as the download is faster
+    than the bitrate it stays ahead of the playhead; if it falls behind, the
+    audio stalls until data arrives, and the connection is closed (ending the
+    track) only after PROGRESSIVE_STALL_TIMEOUT seconds without progress.
+    """
+
+    def __init__(self, stall_timeout: float):
+        self.stall_timeout = stall_timeout
+        self._files = TTLCache(256, 6 * 3600)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._port: Optional[int] = None
+
+    async def url(self, growing: GrowingFile) -> str:
+        if self._server is None:
+            self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+            self._port = self._server.sockets[0].getsockname()[1]
+        token = secrets.token_urlsafe(12)
+        self._files.set(token, growing)
+        return f"http://127.0.0.1:{self._port}/{token}"
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 10)
+            parts = request.split(b" ", 2)
+            growing = self._files.get(parts[1].decode().lstrip("/")) if len(parts) == 3 else None
+            if growing is None or growing.failed:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                return
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/octet-stream\r\nConnection: close\r\n\r\n")
+            await self._pipe(growing, writer)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            LOGGER(__name__).warning(f"Progressive stream failed: {e!r}")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def _pipe(self, growing: GrowingFile, writer: asyncio.StreamWriter) -> None:
+        f = None
+        last_progress = time.monotonic()
+        try:
+            while not growing.failed:
+                if f is None:
+                    try:
+                        f = open(growing.path, "rb")
+                    except (FileNotFoundError, TypeError):
+                        # Caught between a rename and the hook reporting it.
+                        pass
+                data = f.read(READ_SIZE) if f is not None else b""
+                if data:
+                    writer.write(data)
+                    await writer.drain()
+                    last_progress = time.monotonic()
+                    continue
+                if f is not None and growing.done:
+                    return
+                if time.monotonic() - last_progress > self.stall_timeout:
+                    LOGGER(__name__).warning(f"Progressive download of {growing.path} stalled, ending stream.")
+                    return
+                await asyncio.sleep(0.2)
+        finally:
+            if f is not None:
+                f.close()
+
+
+progressive = ProgressiveServer(PROGRESSIVE_STALL_TIMEOUT)
@@ -1,8 +1,8 @@
-import asyncio
 from typing import Union
 
 from Toxic.misc import db
 from Toxic.utils.formatters import check_duration, seconds_to_min
+from Toxic.utils.stream.prefetch import prefetcher
 from config import autoclean, time_to_seconds
 
 
@@ -45,6 +45,7 @@ async def put_queue(
     else:
         db[chat_id].append(put)
     autoclean.append(file)
+    prefetcher.refresh(chat_id)
 
 
 async def put_queue_index(
@@ -60,9 +61,7 @@ async def put_queue_index(
 ):
     if "20.212.146.162" in vidid:
         try:
-            dur = await asyncio.get_event_loop().run_in_executor(
-                None, check_duration, vidid
-            )
+            dur = await check_duration(vidid)
             duration = seconds_to_min(dur)
         except:
             duration = "ᴜʀʟ sᴛʀᴇᴀᴍ"
@@ -89,3 +88,4 @@ async def put_queue_index(
             db[chat_id].append(put)
     else:
         db[chat_id].append(put)
+    prefetcher.refresh(chat_id)
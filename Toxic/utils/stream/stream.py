@@ -1,4 +1,6 @@
+import asyncio
 import os
+from contextlib import aclosing
 from random import randint
 from typing import Union
 
@@ -6,16 +8,79 @@ from pyrogram.types import InlineKeyboardMarkup
 
 import config
 from Toxic import Carbon, YouTube, app
-from Toxic.core.call import Dev
+from Toxic.core.player import players
 from Toxic.misc import db
 from Toxic.utils.database import add_active_video_chat, is_active_chat
 from Toxic.utils.exceptions import AssistantErr
 from Toxic.utils.inline import aq_markup, close_markup, stream_markup
 from Toxic.utils.pastebin import DevBin
+from Toxic.utils.ratelimit import NOW_PLAYING, PREFETCH, governor
+from Toxic.utils.stream.live import live
 from Toxic.utils.stream.queue import put_queue, put_queue_index
 from Toxic.utils.thumbnails import get_thumb
 
 
+async def _resolve_playlist(result, videoid):
+    """Resolves playlist entries concurrently, yielding them in queue order.
+
+    ``result`` may be a list or an async iterator that is still producing
+    entries; lookups start as soon as each entry arrives. Video ids that
+    recently failed to play are dropped without a lookup.
+    """
+    limiter = asyncio.Semaphore(config.PLAYLIST_FETCH_CONCURRENCY)
+    pending = asyncio.Queue()
+    submitted = []
+
+    async def resolve(search, level):
+        if isinstance(search, dict):
+            search = search["id"]
+        async with limiter:
+            with governor.priority(level):
+                return await YouTube.details(search, videoid)
+
+    def known_bad(search):
+        if isinstance(search, dict):
+            return YouTube.unplayable(search["id"])
+        return videoid and YouTube.unplayable(search)
+
+    def submit(search):
+        if known_bad(search):
+            return
+        # Only the first track is about to play; the rest only fill the queue.
+        level = PREFETCH if submitted else NOW_PLAYING
+        submitted.append(search)
+        pending.put_nowait(asyncio.create_task(resolve(search, level)))
+
+    async def feed():
+        try:
+            if hasattr(result, "__aiter__"):
+                async for search in result:
+                    submit(search)
+            else:
+                for search in result:
+                    submit(search)
+        finally:
+            pending.put_nowait(None)
+
+    feeder = asyncio.create_task(feed())
+    tasks = []
+    try:
+        while (task := await pending.get()) is not None:
+            tasks.append(task)
+            try:
+                yield await task
+            except Exception:
+                continue
+    finally:
+        feeder.cancel()
+        while not pending.empty():
+            task = pending.get_nowait()
+            if task:
+                tasks.append(task)
+        for task in tasks:
+            task.cancel()
+
+
 async def stream(
     _,
     mystic,
@@ -32,88 +97,93 @@ async def stream(
     if not result:
         return
     if forceplay:
-        await Dev.force_stop_stream(chat_id)
+        await players.force_stop(chat_id)
     if streamtype == "playlist":
         msg = f"{_['play_19']}\n\n"
         count = 0
-        for search in result:
-            if int(count) == config.PLAYLIST_FETCH_LIMIT:
-                continue
-            try:
-                (
-                    title,
-                    duration_min,
-                    duration_sec,
-                    thumbnail,
-                    vidid,
-                ) = await YouTube.details(search, False if spotify else True)
-            except:
-                continue
-            if str(duration_min) == "None":
-                continue
-            if duration_sec > config.DURATION_LIMIT:
-                continue
-            if await is_active_chat(chat_id):
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                )
-                position = len(db.get(chat_id)) - 1
-                count += 1
-                msg += f"{count}. {title[:70]}\n"
-                msg += f"{_['play_20']} {position}\n\n"
-            else:
-                if not forceplay:
-                    db[chat_id] = []
-                status = True if video else None
-                try:
-                    file_path, direct = await YouTube.download(
-                        vidid, mystic, video=status, videoid=True
+        started = False
+        async with aclosing(
+            _resolve_playlist(result, False if spotify else True)
+        ) as entries:
+            async for info in entries:
+                if int(count) == config.PLAYLIST_FETCH_LIMIT:
+                    break
+                title = info["title"]
+                duration_min = info["duration_min"]
+                duration_sec = info["duration_sec"]
+                thumbnail = info["thumbnail"]
+                vidid = info["id"]
+                if str(duration_min) == "None":
+                    continue
+                if YouTube.unplayable(vidid):
+                    continue
+                if duration_sec > config.DURATION_LIMIT:
+                    continue
+                if await is_active_chat(chat_id):
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        f"vid_{vidid}",
+                        title,
+                        duration_min,
+                        user_name,
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
                     )
-                except:
-                    raise AssistantErr(_["play_14"])
-                await Dev.join_call(
-                    chat_id,
-                    original_chat_id,
-                    file_path,
-                    video=status,
-                    image=thumbnail,
-                )
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    file_path if direct else f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                    forceplay=forceplay,
-                )
-                img = await get_thumb(vidid)
-                button = stream_markup(_, chat_id)
-                run = await app.send_photo(
-                    original_chat_id,
-                    photo=img,
-                    caption=_["stream_1"].format(
-                        f"https://t.me/{app.username}?start=info_{vidid}",
-                        title[:23],
+                    position = len(db.get(chat_id)) - 1
+                    count += 1
+                    msg += f"{count}. {title[:70]}\n"
+                    msg += f"{_['play_20']} {position}\n\n"
+                else:
+                    if not forceplay:
+                        db[chat_id] = []
+                    status = True if video else None
+                    try:
+                        file_path, direct = await YouTube.download(
+                            vidid, mystic, video=status, videoid=True
+                        )
+                    except:
+                        raise AssistantErr(_["play_14"])
+                    await players.join(
+                        chat_id,
+                        original_chat_id,
+                        file_path,
+                        video=status,
+                        image=thumbnail,
+                    )
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        file_path if direct else f"vid_{vidid}",
+                        title,
                         duration_min,
                         user_name,
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
+                        forceplay=forceplay,
+                    )
+                    img = await get_thumb(vidid)
+                    button = stream_markup(_, chat_id)
+                    run = await app.send_photo(
+                        original_chat_id,
+                        photo=img,
+                        caption=_["stream_1"].format(
+                            f"https://t.me/{app.username}?start=info_{vidid}",
+                            title[:23],
+                            duration_min,
+                            user_name,
+                        ),
+                        reply_markup=InlineKeyboardMarkup(button),
+                    )
+                    db[chat_id][0]["mystic"] = run
+                    db[chat_id][0]["markup"] = "stream"
+                    started = True
         if count == 0:
+            if not started:
+                # The listing failed or nothing in it was playable.
+                raise AssistantErr(_["play_3"])
             return
         else:
             link = await DevBin(msg)
@@ -139,7 +209,11 @@ async def stream(
         status = True if video else None
         try:
             file_path, direct = await YouTube.download(
-                vidid, mystic, videoid=True, video=status
+                vidid,
+                mystic,
+                videoid=True,
+                video=status,
+                progressive=not await is_active_chat(chat_id),
             )
         except:
             raise AssistantErr(_["play_14"])
@@ -165,7 +239,7 @@ async def stream(
         else:
             if not forceplay:
                 db[chat_id] = []
-            await Dev.join_call(
+            await players.join(
                 chat_id,
                 original_chat_id,
                 file_path,
@@ -225,7 +299,7 @@ async def stream(
         else:
             if not forceplay:
                 db[chat_id] = []
-            await Dev.join_call(chat_id, original_chat_id, file_path, video=None)
+            await players.join(chat_id, original_chat_id, file_path, video=None)
             await put_queue(
                 chat_id,
                 original_chat_id,
@@ -277,7 +351,7 @@ async def stream(
         else:
             if not forceplay:
                 db[chat_id] = []
-            await Dev.join_call(chat_id, original_chat_id, file_path, video=status)
+            await players.join(chat_id, original_chat_id, file_path, video=status)
             await put_queue(
                 chat_id,
                 original_chat_id,
@@ -333,7 +407,7 @@ async def stream(
             n, file_path = await YouTube.video(link)
             if n == 0:
                 raise AssistantErr(_["str_3"])
-            await Dev.join_call(
+            await players.join(
                 chat_id,
                 original_chat_id,
                 file_path,
@@ -352,6 +426,7 @@ async def stream(
                 "video" if video else "audio",
                 forceplay=forceplay,
             )
+            live.watch(chat_id, vidid, video, file_path)
             img = await get_thumb(vidid)
             button = stream_markup(_, chat_id)
             run = await app.send_photo(
@@ -391,7 +466,7 @@ async def stream(
         else:
             if not forceplay:
                 db[chat_id] = []
-            await Dev.join_call(
+            await players.join(
                 chat_id,
                 original_chat_id,
                 link,
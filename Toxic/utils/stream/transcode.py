@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Union
+
+from Toxic.logging import LOGGER
+from Toxic.utils.ratelimit import BACKGROUND
+from Toxic.utils.scheduler import scheduler
+from config import TRANSCODE_VIDEO, TRANSCODE_WORKERS
+
+# Variants sit next to their source: "<id>.audio.best.webm" -> "<id>.audio.best.norm.opus".
+VARIANT_MARK = ".norm."
+AUDIO_ARGS = ["-vn", "-ac", "2", "-ar", "48000", "-c:a", "libopus", "-b:a", "128k"]
+VIDEO_ARGS = [
+    "-vf", "scale=-2:'min(720,ih)'",
+    "-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-pix_fmt", "yuv420p",
+    "-ac", "2", "-ar", "48000", "-c:a", "libopus", "-b:a", "128k",
+]
+
+
+class Transcoder:
+    """Re-encodes downloaded tracks once into the format calls decode cheapest.
+
+    pytgcalls feeds every call through ffmpeg, which has to decode and
+    resample whatever container yt-dlp picked, per chat and per play. A
+    48 kHz stereo Opus copy (720p H.264 for videos when TRANSCODE_VIDEO is
+    set) leaves ffmpeg with a plain decode. Sources that already match are
+    left alone.
+    """
+
+    def __init__(self, workers: int, video: bool):
+        self.video = video
+        self._slots = asyncio.Semaphore(max(workers, 1))
+        self._enabled = workers > 0
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._native: set = set()
+
+    @staticmethod
+    def variant_path(source: Union[str, Path]) -> Path:
+        source = Path(source)
+        ext = "mkv" if ".video." in source.name else "opus"
+        return source.with_name(f"{source.stem}{VARIANT_MARK}{ext}")
+
+    @staticmethod
+    def is_variant(path: Union[str, Path]) -> bool:
+        return VARIANT_MARK in Path(path).name
+
+    def preferred(self, link: str) -> str:
+        """The normalized variant of ``link`` if one is ready, else ``link``."""
+        if not isinstance(link, (str, Path)) or not os.path.isfile(link):
+            return link
+        variant = self.variant_path(link)
+        if not variant.is_file():
+            return link
+        # Keep the variant as fresh as its source for the cache pruning.
+        os.utime(variant)
+        return str(variant)
+
+    def schedule(self, source: Union[str, Path], video: bool = False) -> None:
+        source = str(source)
+        if not self._enabled or (video and not self.video):
+            return
+        if self.is_variant(source) or source in self._native or source in self._tasks:
+            return
+        if self.variant_path(source).is_file():
+            return
+        task = asyncio.create_task(self._transcode(source, video))
+        self._tasks[source] = task
+        task.add_done_callback(lambda _: self._tasks.pop(source, None))
+
+    async def _run(self, *args: str) -> tuple[int, bytes]:
+        kind = args[0]
+        if shutil.which("nice"):
+            args = ("nice", "-n", "10") + args
+        code, out, err = await scheduler.run(kind, *args, priority=BACKGROUND)
+        if code:
+            LOGGER(__name__).warning(err.decode(errors="ignore")[-300:])
+        return code, out
+
+    async def _is_native(self, source: str, video: bool) -> bool:
+        code, out = await self._run(
+            "ffprobe", "-v", "error",
+            "-show_entries", "stream=codec_type,codec_name,sample_rate,channels,height",
+            "-of", "json", source,
+        )
+        if code:
+            return False
+        streams = json.loads(out or b"{}").get("streams", [])
+        audio = [s for s in streams if s.get("codec_type") == "audio"]
+        video_streams = [s for s in streams if s.get("codec_type") == "video"]
+        audio_ok = bool(audio) and all(
+            s.get("codec_name") == "opus" and str(s.get("sample_rate")) == "48000" and s.get("channels") == 2
+            for s in audio
+        )
+        if not video:
+            return audio_ok and not video_streams
+        return audio_ok and bool(video_streams) and all(
+            s.get("codec_name") == "h264" and int(s.get("height") or 0) <= 720 for s in video_streams
+        )
+
+    async def _transcode(self, source: str, video: bool) -> None:
+        variant = self.variant_path(source)
+        tmp = variant.with_name(f"{variant.name}.part")
+        try:
+            async with self._slots:
+                if await self._is_native(source, video):
+                    self._native.add(source)
+                    return
+                code, _ = await self._run(
+                    "ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-i", source,
+                    *(VIDEO_ARGS if video else AUDIO_ARGS),
+                    "-f", "matroska" if video else "ogg", str(tmp),
+                )
+            if code == 0 and tmp.is_file() and tmp.stat().st_size > 0:
+                os.replace(tmp, variant)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            LOGGER(__name__).warning(f"Transcoding {source} failed: {e!r}")
+        finally:
+            tmp.unlink(missing_ok=True)
+
+
+transcoder = Transcoder(TRANSCODE_WORKERS, TRANSCODE_VIDEO)
@@ -0,0 +1,143 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+import yt_dlp
+
+from Toxic.logging import LOGGER
+
+BASE_OPTS = {
+    "geo_bypass": True,
+    "nocheckcertificate": True,
+    "quiet": True,
+    "no_warnings": True,
+    "skip_download": True,
+}
+
+# One YoutubeDL per (format, proxy) kept alive inside each worker process.
+_instances: dict = {}
+
+
+class PoolUnavailable(Exception):
+    pass
+
+
+def _ydl(fmt: Optional[str] = None, proxy: Optional[str] = None, **extra) -> yt_dlp.YoutubeDL:
+    key = (fmt, proxy, tuple(sorted(extra.items())))
+    ydl = _instances.get(key)
+    if ydl is None:
+        opts = dict(BASE_OPTS, **extra)
+        if fmt:
+            opts["format"] = fmt
+        if proxy:
+            opts["proxy"] = proxy
+        ydl = _instances[key] = yt_dlp.YoutubeDL(opts)
+    return ydl
+
+
+def _warm() -> bool:
+    _ydl()
+    yt_dlp.extractor.gen_extractor_classes()
+    return True
+
+
+def resolve(link: str, fmt: str, proxy: Optional[str] = None) -> str:
+    info = _ydl(fmt, proxy, noplaylist=True).extract_info(link, download=False)
+    if info.get("url"):
+        return info["url"]
+    return info["requested_formats"][0]["url"]
+
+
+class YtDlpPool:
+    """Pre-warmed worker processes running yt-dlp in-process.
+
+    Each worker is its own single-process executor, so a job that hangs only
+    costs the worker it ran on: that one is killed and forked again while the
+    others keep serving. A worker goes back to the idle queue when its job
+    finishes, not when the caller stops waiting.
+    """
+
+    def __init__(self, workers: int, queue_size: int, timeout: float):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(workers + queue_size)
+        self._idle: Optional[asyncio.Queue] = None
+        self._executors: set = set()
+
+    def _fork(self) -> ProcessPoolExecutor:
+        # Workers must be forked: spawned children would re-import Toxic and boot the bot.
+        executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("fork"),
+        )
+        executor.submit(_warm)
+        self._executors.add(executor)
+        return executor
+
+    def _kill(self, executor: ProcessPoolExecutor) -> None:
+        self._executors.discard(executor)
+        for proc in list((getattr(executor, "_processes", None) or {}).values()):
+            try:
+                proc.kill()
+            except Exception:
+                pass
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _replace(self, executor: ProcessPoolExecutor) -> None:
+        self._kill(executor)
+        if self._idle is not None:
+            self._idle.put_nowait(self._fork())
+
+    def _release(self, executor: ProcessPoolExecutor) -> None:
+        # A killed worker was already replaced; don't hand it out again.
+        if self._idle is not None and executor in self._executors:
+            self._idle.put_nowait(executor)
+
+    def _reap(self, executor: ProcessPoolExecutor, job: Future) -> None:
+        if not job.done() and executor in self._executors:
+            LOGGER(__name__).warning("Abandoned yt-dlp job is still running, replacing its worker.")
+            self._replace(executor)
+
+    def start(self) -> None:
+        if self.workers <= 0 or self._idle is not None:
+            return
+        self._idle = asyncio.Queue()
+        for _ in range(self.workers):
+            self._idle.put_nowait(self._fork())
+        LOGGER(__name__).info(f"Started {self.workers} yt-dlp workers.")
+
+    async def run(self, func: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        if self._idle is None or self._slots.locked():
+            raise PoolUnavailable("yt-dlp pool is not available")
+        timeout = timeout or self.timeout
+        async with self._slots:
+            executor = await self._idle.get()
+            loop = asyncio.get_running_loop()
+            try:
+                job = executor.submit(func, *args)
+            except (BrokenProcessPool, RuntimeError):
+                self._replace(executor)
+                raise PoolUnavailable("yt-dlp worker broke")
+            # The worker is only handed out again once its job is really over.
+            job.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release, executor))
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(job), timeout)
+            except asyncio.TimeoutError:
+                LOGGER(__name__).warning(f"yt-dlp job {func.__name__} timed out, replacing its worker.")
+                self._replace(executor)
+                raise
+            except BrokenProcessPool:
+                self._replace(executor)
+                raise PoolUnavailable("yt-dlp worker broke")
+            except asyncio.CancelledError:
+                # The caller left but the job keeps the worker busy; give it the usual time.
+                loop.call_later(timeout, self._reap, executor, job)
+                raise
+
+    def shutdown(self) -> None:
+        for executor in list(self._executors):
+            self._executors.discard(executor)
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._idle = None
@@ -1,5 +1,5 @@
 import re
-from os import getenv
+from os import environ, getenv
 
 from dotenv import load_dotenv
 from pyrogram import filters
@@ -54,6 +54,50 @@ SPOTIFY_CLIENT_SECRET = getenv("SPOTIFY_CLIENT_SECRET", None)
 # Maximum limit for fetching playlist's track from youtube, spotify, apple links.
 PLAYLIST_FETCH_LIMIT = int(getenv("PLAYLIST_FETCH_LIMIT", 25))
 
+# Number of playlist tracks resolved at the same time.
+PLAYLIST_FETCH_CONCURRENCY = int(getenv("PLAYLIST_FETCH_CONCURRENCY", 5))
+
+# Maximum number of upcoming tracks downloaded in the background at once, across all chats.
+PREFETCH_LIMIT = int(getenv("PREFETCH_LIMIT", 4))
+
+# Requests per second (and burst size) allowed towards youtube search and yt-dlp, 0 to disable.
+SEARCH_RATE = float(getenv("SEARCH_RATE", 5))
+SEARCH_BURST = int(getenv("SEARCH_BURST", 10))
+YTDL_RATE = float(getenv("YTDL_RATE", 3))
+YTDL_BURST = int(getenv("YTDL_BURST", 6))
+# Seconds thumbnails and inline search may wait for that budget before they are dropped.
+RATE_BACKGROUND_WAIT = float(getenv("RATE_BACKGROUND_WAIT", 3))
+
+# Maximum child processes of each kind running at once, and their default timeout in seconds.
+PROC_LIMITS = {
+    "ytdlp": int(getenv("PROC_LIMIT_YTDLP", 4)),
+    "ffmpeg": int(getenv("PROC_LIMIT_FFMPEG", 2)),
+    "ffprobe": int(getenv("PROC_LIMIT_FFPROBE", 4)),
+    "shell": int(getenv("PROC_LIMIT_SHELL", 2)),
+}
+PROC_TIMEOUTS = {
+    "ytdlp": int(getenv("PROC_TIMEOUT_YTDLP", 60)),
+    "ffmpeg": int(getenv("PROC_TIMEOUT_FFMPEG", 1800)),
+    "ffprobe": int(getenv("PROC_TIMEOUT_FFPROBE", 30)),
+    "shell": None,
+}
+
+# Start playing a youtube track once this many seconds of it are downloaded, 0 to wait for the whole file.
+PROGRESSIVE_PREFIX = int(getenv("PROGRESSIVE_PREFIX", 10))
+# End a track that is still downloading if its download makes no progress for this many seconds.
+PROGRESSIVE_STALL_TIMEOUT = int(getenv("PROGRESSIVE_STALL_TIMEOUT", 30))
+
+# Seconds before a live stream's url expires that a freshly resolved one is swapped in.
+LIVE_REFRESH_AHEAD = int(getenv("LIVE_REFRESH_AHEAD", 600))
+# Restart a live stream that makes no progress for this many seconds, at most LIVE_MAX_RESTARTS times an hour.
+LIVE_STALL_TIMEOUT = int(getenv("LIVE_STALL_TIMEOUT", 20))
+LIVE_MAX_RESTARTS = int(getenv("LIVE_MAX_RESTARTS", 6))
+
+# Number of background ffmpeg jobs converting downloaded tracks to 48 kHz stereo Opus, 0 to disable.
+TRANSCODE_WORKERS = int(getenv("TRANSCODE_WORKERS", 1))
+# Set this to True to also convert downloaded videos to 720p H.264.
+TRANSCODE_VIDEO = bool(getenv("TRANSCODE_VIDEO", False))
+
 
 # Telegram audio and video file size limit (in bytes)
 TG_AUDIO_FILESIZE_LIMIT = int(getenv("TG_AUDIO_FILESIZE_LIMIT", 104857600))
@@ -69,12 +113,29 @@ API_KEY = getenv("API_KEY", "")
 # For - downloads
 DOWNLOADS_DIR = "downloads"
 
+# Cache for youtube search results, set META_CACHE_MONGO to keep it across restarts
+META_CACHE_SIZE = int(getenv("META_CACHE_SIZE", 4096))
+META_CACHE_TTL = int(getenv("META_CACHE_TTL", 86400))
+META_CACHE_MONGO = bool(getenv("META_CACHE_MONGO", False))
+
+# Seconds a failing youtube video is skipped: after a transient error, and when it is private, removed, age or geo restricted
+NEGATIVE_CACHE_TTL = int(getenv("NEGATIVE_CACHE_TTL", 30))
+NEGATIVE_CACHE_PERMANENT_TTL = int(getenv("NEGATIVE_CACHE_PERMANENT_TTL", 86400))
+
+# Shared HTTP clients: connection pool size, timeout and DNS cache lifetime (in seconds)
+HTTP_POOL_SIZE = int(getenv("HTTP_POOL_SIZE", 50))
+HTTP_TIMEOUT = int(getenv("HTTP_TIMEOUT", 120))
+HTTP_DNS_TTL = int(getenv("HTTP_DNS_TTL", 300))
+
 # Get your pyrogram v2 session from @StringFatherBot on Telegram
-STRING1 = getenv("STRING_SESSION", None)
-STRING2 = getenv("STRING_SESSION2", None)
-STRING3 = getenv("STRING_SESSION3", None)
-STRING4 = getenv("STRING_SESSION4", None)
-STRING5 = getenv("STRING_SESSION5", None)
+# Set STRING_SESSION, STRING_SESSION2, STRING_SESSION3 ... one per assistant account, as many as you have.
+# STRING_SESSION and STRING_SESSION1 both name assistant 1, so set only one of them.
+_SESSION_KEYS = sorted(
+    (int(match[1] or 1), key)
+    for key, value in environ.items()
+    if value and (match := re.fullmatch(r"STRING_SESSION(\d*)", key))
+)
+STRING_SESSIONS = {number: environ[key] for number, key in _SESSION_KEYS}
 
 
 BANNED_USERS = filters.user()
@@ -127,6 +188,12 @@ def time_to_seconds(time):
 DURATION_LIMIT = int(time_to_seconds(f"{DURATION_LIMIT_MIN}:00"))
 
 
+_SESSION_CLASHES = [key for number, key in _SESSION_KEYS if [n for n, _ in _SESSION_KEYS].count(number) > 1]
+if _SESSION_CLASHES:
+    raise SystemExit(
+        f"[ERROR] - {', '.join(_SESSION_CLASHES)} are set for the same assistant. Please keep only one of them."
+    )
+
 if SUPPORT_CHANNEL:
     if not re.match("(?:http|https)://", SUPPORT_CHANNEL):
         raise SystemExit(
@@ -2,6 +2,7 @@ import os
 import logging
 import tempfile
 import random
+import subprocess
 from datetime import datetime
 import config
 import pytz
@@ -29,14 +30,28 @@ def ask_gemini(question: str) -> str:
     text = response.json()["candidates"][0]["content"]["parts"][0]["text"]
     return text.strip()
 
-def text_to_ogg(text: str, lang: str = "hi") -> str:
+def text_to_ogg(text: str, lang: str = "hi"):
     tts = gTTS(text=text, lang=lang)
     with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as f:
         mp3_path = f.name
         tts.save(mp3_path)
     ogg_path = mp3_path.replace(".mp3", ".ogg")
-    os.system(f'ffmpeg -y -i "{mp3_path}" -c:a libopus -b:a 48k -vbr on "{ogg_path}"')
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-y", "-i", mp3_path, "-c:a", "libopus", "-b:a", "48k", "-vbr", "on", ogg_path],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=60,
+        )
+        ok = result.returncode == 0 and os.path.exists(ogg_path)
+    except subprocess.TimeoutExpired:
+        logging.warning("ffmpeg took too long to convert the voice reply")
+        ok = False
     os.remove(mp3_path)
+    if not ok:
+        if os.path.exists(ogg_path):
+            os.remove(ogg_path)
+        return None
     return ogg_path
 
 def get_kolkata_datetime() -> str:
@@ -89,6 +104,9 @@ async def ask_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     else:
         await update.message.chat.send_action(action=ChatAction.RECORD_VOICE)
         ogg_path = text_to_ogg(answer, lang="hi" if lang == "hi" else "en")
+        if not ogg_path:
+            await update.message.reply_text("Sorry 😔, voice banane mein dikkat aa gayi, thodi der baad try karo!")
+            return
         await update.message.reply_voice(voice=open(ogg_path, "rb"))
         os.remove(ogg_path)
 